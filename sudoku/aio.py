@@ -0,0 +1,101 @@
+"""
+This module offers asyncio entry points for generating and solving puzzles,
+so that an event loop is never blocked by a search:
+
+    game = await agenerate(Game.HARD)
+    solution = await asolve(board)
+
+The searches run in a thread pool. At most concurrency of them run at once;
+the other calls wait for their turn without blocking the loop. Cancelling
+the awaiting task (e.g. with asyncio.wait_for or task.cancel) sets the
+cancel flag of its search, which stops within CANCEL_INTERVAL iterations
+(see search_problem.py) and frees its thread.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from game import Game
+from sudoku import Sudoku
+from search_problem import Search, SearchCancelled
+
+
+def solve(board, cancel=None, propagation=Game.SINGLES):
+    """
+    Solves a board (a 9x9 list of lists) with an in-place MRV search
+
+    return: the first solution found as a 9x9 list of lists, or None if
+    the board has no solution
+    """
+    search = Search(Sudoku(board), inPlace=True, limit=1,
+                    branching=Sudoku.MRV, propagation=propagation,
+                    recordPath=False, cancel=cancel)
+    solution = search.getFirstSolution()
+    if solution is None:
+        return None
+    return solution.board
+
+
+class AsyncSudoku:
+    """
+    Runs generations and searches in a thread pool on behalf of coroutines,
+    with bounded concurrency and cancellation
+    """
+
+    def __init__(self, concurrency=4, executor=None):
+        """
+        concurrency is the number of searches allowed to run at once;
+        executor defaults to a ThreadPoolExecutor with as many threads
+        """
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.executor = executor
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self, function, *args, **options):
+        """
+        Awaits function(*args, cancel=flag, **options) run in the executor,
+        setting flag if the awaiting task is cancelled
+        """
+        cancel = threading.Event()
+        call = functools.partial(function, *args, cancel=cancel, **options)
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self.executor, call)
+            except asyncio.CancelledError:
+                cancel.set()
+                raise
+
+    async def agenerate(self, level, **options):
+        """ Returns a new Game of the given level (options go to Game) """
+        return await self.run(Game, level, **options)
+
+    async def asolve(self, board, **options):
+        """ Returns the first solution of board, or None (see solve) """
+        return await self.run(solve, board, **options)
+
+    def close(self):
+        """ Shuts the executor down, dropping the calls not started yet """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_default = None
+
+def defaultRunner():
+    """ Returns the AsyncSudoku shared by agenerate and asolve """
+    global _default
+    if _default is None:
+        _default = AsyncSudoku()
+    return _default
+
+
+async def agenerate(level, **options):
+    """ Returns a new Game of the given level using the shared runner """
+    return await defaultRunner().agenerate(level, **options)
+
+
+async def asolve(board, **options):
+    """ Returns the first solution of board using the shared runner """
+    return await defaultRunner().asolve(board, **options)
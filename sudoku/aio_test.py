@@ -0,0 +1,54 @@
+"""
+Unit Tests for the asyncio entry points and search cancellation
+"""
+from aio import *
+from dlx import DancingLinks
+from fixtures import BOARD
+import asyncio
+import threading
+import unittest as u
+
+EMPTY = [[0] * 9 for i in range(9)]
+
+class CancelTest(u.TestCase):
+
+    def test_search_cancelled(self):
+        cancel = threading.Event()
+        cancel.set()
+        state = Sudoku(EMPTY)
+        self.assertRaises(SearchCancelled, Search, state, inPlace=True, cancel=cancel)
+        self.assertEqual(state.board, EMPTY, "Testing cancelled search restores the board")
+        self.assertRaises(SearchCancelled, Search, Sudoku(EMPTY), recordPath=False, cancel=cancel)
+
+    def test_game_cancelled(self):
+        cancel = threading.Event()
+        cancel.set()
+        self.assertRaises(SearchCancelled, Game, Game.EASY, cancel=cancel)
+
+
+class AsyncTest(u.IsolatedAsyncioTestCase):
+
+    async def test_asolve(self):
+        runner = AsyncSudoku(concurrency=2)
+        solution = await runner.asolve(BOARD)
+        self.assertEqual(solution, DancingLinks(BOARD).getFirstSolution(), "Testing solution")
+        runner.close()
+
+    async def test_agenerate(self):
+        game = await agenerate(Game.EASY, rng=1)
+        count, stats = DancingLinks.countSolutions(game.initPuzzle, limit=2)
+        self.assertEqual(count, 1, "Testing generated puzzle has a unique solution")
+
+    async def test_cancel_frees_worker(self):
+        runner = AsyncSudoku(concurrency=1)
+        # Counting every solution of the empty board never finishes
+        endless = runner.run(Search.countSolutions, Sudoku(EMPTY), limit=None, inPlace=True)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(endless, 0.1)
+        solution = await asyncio.wait_for(runner.asolve(BOARD), 10)
+        self.assertIsNotNone(solution, "Testing the single worker is free again")
+        runner.close()
+
+
+if __name__ == "__main__":
+    u.main()
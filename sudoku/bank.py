@@ -0,0 +1,184 @@
+"""
+This module stores pre-generated puzzles in a bank file, so that a game can
+be drawn from it instead of being generated on the request path.
+
+A bank file is a fixed-size header followed by fixed-size records grouped by
+level:
+
+    header  magic, version, record size, and for every level the index of
+            its first record and its number of records
+    record  puzzle and solution (81 entries packed two per byte, 41 bytes
+            each), level, and the seed, node count, backtrack count, search
+            count and search time of the generation
+
+The file is memory-mapped and nothing but the header is read when it is
+opened, so opening a bank of millions of puzzles is instant, and drawing a
+random puzzle of a level only reads the one record it picks:
+
+    PuzzleBank.generate("puzzles.bank", {Game.EASY: 1000, Game.HARD: 1000})
+    with PuzzleBank("puzzles.bank") as bank:
+        game = Game.fromBank(bank, Game.HARD)
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from generator import makeRng
+from batch import generateBatch
+
+MAGIC = b"SUDOKUBK"
+VERSION = 1
+LEVELS = 3
+
+PACKED_SIZE = 41
+RECORD = struct.Struct("<%ds%dsBQIIIf" % (PACKED_SIZE, PACKED_SIZE))
+HEADER = struct.Struct("<8sHH" + "QQ" * LEVELS)
+HEADER_SIZE = 64
+
+# Stats stored with every record, in the order of the record fields
+STATS = ("seed", "nodesExpanded", "backtracks", "searches", "searchTime")
+
+
+def pack(board):
+    """ Packs a 9x9 board into 41 bytes, two entries per byte """
+    cells = [number for row in board for number in row] + [0]
+    return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+
+
+def unpack(data):
+    """ Unpacks 41 bytes into a 9x9 board """
+    cells = []
+    for byte in data:
+        cells.append(byte >> 4)
+        cells.append(byte & 0xF)
+    return [cells[row*9:row*9 + 9] for row in range(9)]
+
+
+class PuzzleBank:
+    """
+    Read-only view of a bank file
+    """
+
+    def __init__(self, path):
+        """
+        Opens the bank file at path
+
+        raise: ValueError if the file is not a bank file or is truncated
+        """
+        self.file = open(path, "rb")
+        self.data = None
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise ValueError("Not a puzzle bank: " + str(path))
+            self.data = mmap.mmap(self.file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            fields = HEADER.unpack_from(self.data, 0)
+            magic, version, recordSize = fields[:3]
+            if magic != MAGIC or version != VERSION or \
+                    recordSize != RECORD.size:
+                raise ValueError("Not a puzzle bank: " + str(path))
+            self.starts = fields[3::2]
+            self.counts = fields[4::2]
+            end = max(start + count
+                      for start, count in zip(self.starts, self.counts))
+            if size < HEADER_SIZE + end * RECORD.size:
+                raise ValueError("Truncated puzzle bank: " + str(path))
+        except BaseException:
+            self.close()
+            raise
+
+    @staticmethod
+    def write(path, records):
+        """
+        Writes a bank file from an iterable of (level, puzzle, solution,
+        stats) records, where stats is a dictionary that may hold the keys
+        listed in STATS.
+
+        The records are streamed to one temporary file per level, so they
+        never all sit in memory.
+
+        return: the number of records written for every level
+        """
+        parts = [tempfile.TemporaryFile() for level in range(LEVELS)]
+        counts = [0] * LEVELS
+        try:
+            for level, puzzle, solution, stats in records:
+                values = [stats.get(name) or 0 for name in STATS]
+                parts[level].write(RECORD.pack(pack(puzzle), pack(solution),
+                                               level, *values))
+                counts[level] += 1
+
+            fields = [MAGIC, VERSION, RECORD.size]
+            start = 0
+            for count in counts:
+                fields += [start, count]
+                start += count
+            with open(path, "wb") as bank:
+                bank.write(HEADER.pack(*fields).ljust(HEADER_SIZE, b"\0"))
+                for part in parts:
+                    part.seek(0)
+                    shutil.copyfileobj(part, bank)
+        finally:
+            for part in parts:
+                part.close()
+        return counts
+
+    @staticmethod
+    def generate(path, counts, **options):
+        """
+        Generates counts[level] puzzles for every level with
+        batch.generateBatch (options are passed to it) and writes them to
+        a bank file
+
+        return: the number of records written for every level
+        """
+        def records():
+            for level, n in counts.items():
+                for puzzle, solution, stats in generateBatch(level, n, **options):
+                    yield level, puzzle, solution, stats
+
+        return PuzzleBank.write(path, records())
+
+    def count(self, level):
+        """ Returns the number of puzzles of a level """
+        return self.counts[level]
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def get(self, level, index):
+        """
+        Returns the index-th (puzzle, solution, stats) record of a level
+        """
+        if not 0 <= index < self.counts[level]:
+            raise IndexError("No puzzle %d for level %d" % (index, level))
+        offset = HEADER_SIZE + (self.starts[level] + index) * RECORD.size
+        fields = RECORD.unpack_from(self.data, offset)
+        stats = dict(zip(STATS, fields[3:]))
+        stats["level"] = fields[2]
+        return unpack(fields[0]), unpack(fields[1]), stats
+
+    def draw(self, level, rng=None):
+        """
+        Returns a random (puzzle, solution, stats) record of a level
+
+        rng is a random.Random or a seed (see generator.makeRng)
+        """
+        if self.counts[level] == 0:
+            raise IndexError("No puzzle for level %d" % level)
+        return self.get(level, makeRng(rng).randrange(self.counts[level]))
+
+    def close(self):
+        """ Releases the mapping and the file """
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
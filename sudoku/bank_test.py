@@ -0,0 +1,74 @@
+"""
+Unit Tests for the puzzle bank
+"""
+from bank import *
+from game import Game
+import os
+import random
+import tempfile
+import unittest as u
+
+class PuzzleBankTest(u.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "puzzles.bank")
+        self.games = [Game(level, rng=level) for level in (Game.EASY, Game.HARD, Game.HARD)]
+        records = [(level, game.initPuzzle, game.solution, {"seed": level})
+                   for level, game in zip((Game.EASY, Game.HARD, Game.HARD), self.games)]
+        PuzzleBank.write(self.path, records)
+        self.bank = PuzzleBank(self.path)
+
+    def tearDown(self):
+        self.bank.close()
+        self.directory.cleanup()
+
+    def test_pack(self):
+        board = self.games[0].initPuzzle
+        self.assertEqual(len(pack(board)), PACKED_SIZE, "Testing packed size")
+        self.assertEqual(unpack(pack(board)), board, "Testing packing round trip")
+
+    def test_counts(self):
+        self.assertEqual(self.bank.count(Game.EASY), 1, "Testing easy count")
+        self.assertEqual(self.bank.count(Game.MEDIUM), 0, "Testing medium count")
+        self.assertEqual(self.bank.count(Game.HARD), 2, "Testing hard count")
+        self.assertEqual(len(self.bank), 3, "Testing total count")
+
+    def test_get(self):
+        puzzle, solution, stats = self.bank.get(Game.HARD, 1)
+        self.assertEqual(puzzle, self.games[2].initPuzzle, "Testing stored puzzle")
+        self.assertEqual(solution, self.games[2].solution, "Testing stored solution")
+        self.assertEqual(stats["level"], Game.HARD, "Testing stored level")
+        self.assertEqual(stats["seed"], Game.HARD, "Testing stored seed")
+        self.assertRaises(IndexError, self.bank.get, Game.HARD, 2)
+
+    def test_draw(self):
+        puzzles = [game.initPuzzle for game in self.games[1:]]
+        for seed in range(5):
+            puzzle, solution, stats = self.bank.draw(Game.HARD, seed)
+            self.assertTrue(puzzle in puzzles, "Testing drawn puzzle has the level")
+        self.assertRaises(IndexError, self.bank.draw, Game.MEDIUM)
+
+    def test_fromBank(self):
+        game = Game.fromBank(self.bank, Game.EASY, random.Random(1))
+        self.assertEqual(game.initPuzzle, self.games[0].initPuzzle, "Testing game puzzle")
+        self.assertEqual(game.solution, self.games[0].solution, "Testing game solution")
+        self.assertEqual(game.board, game.initPuzzle, "Testing game starts on the puzzle")
+
+    def test_not_a_bank(self):
+        with open(self.path, "r+b") as bank:
+            bank.write(b"NOTABANK")
+        self.assertRaises(ValueError, PuzzleBank, self.path)
+
+    def test_truncated_bank(self):
+        self.bank.close()
+        with open(self.path, "rb") as bank:
+            data = bank.read()
+        for size in (0, 10, HEADER_SIZE, len(data) - 1):
+            with open(self.path, "wb") as bank:
+                bank.write(data[:size])
+            self.assertRaises(ValueError, PuzzleBank, self.path)
+
+
+if __name__ == "__main__":
+    u.main()
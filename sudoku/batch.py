@@ -0,0 +1,90 @@
+"""
+This module generates many Sudoku puzzles at once by spreading the Game
+constructions over a pool of worker processes.
+
+Every puzzle gets its own seed, drawn from the batch seed, so a batch can be
+replayed exactly whatever the number of workers or the order in which the
+puzzles finish. Results are yielded as soon as they are ready:
+
+    for puzzle, solution, stats in generateBatch(Game.HARD, 1000, workers=8):
+        store(puzzle, solution)
+
+Breaking out of the loop, closing the generator or setting the cancel event
+stops the batch: puzzles not started yet are cancelled and no new ones are
+submitted.
+
+With unique set, puzzles equivalent to one already yielded (see
+canonical.py) are dropped and replaced by new ones.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from game import Game
+from hooks import Metrics
+from canonical import DedupIndex
+
+
+def generateOne(level, seed, options):
+    """
+    Generates a single puzzle with the given seed (runs in a worker)
+
+    return: a (puzzle, solution, stats) tuple where stats holds the
+    Metrics summary of the generation and the seed used
+    """
+    metrics = Metrics()
+    game = Game(level, hooks=metrics, rng=random.Random(seed), **options)
+    stats = metrics.summary()
+    stats["seed"] = seed
+    return game.initPuzzle, game.solution, stats
+
+
+def generateBatch(level, n, workers=None, seed=None, cancel=None,
+                  unique=False, **options):
+    """
+    Generates n puzzles of the given level in a ProcessPoolExecutor and
+    yields (puzzle, solution, stats) tuples in the order they finish.
+
+    workers is the number of processes (all CPUs by default), seed makes
+    the batch reproducible, cancel is an optional threading.Event that
+    stops the batch when set, and any other option is passed to Game.
+    unique drops the puzzles equivalent to one already yielded: True
+    checks them against this batch only, while a DedupIndex also checks
+    them against (and adds them to) the puzzles it already holds.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if unique is True:
+        index = DedupIndex()
+    elif unique is False or unique is None:
+        index = None
+    else:
+        # An empty index is falsy, so it is not tested for truth
+        index = unique
+    seeds = random.Random(seed)
+    # Only keep a few tasks per worker in flight, so that cancelling does
+    # not leave thousands of queued tasks behind
+    window = workers * 2
+    produced = 0
+    pending = set()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while produced < n:
+            if cancel is not None and cancel.is_set():
+                return
+            # Never more tasks in flight than puzzles still missing, so
+            # without duplicates exactly n puzzles are generated
+            while produced + len(pending) < n and len(pending) < window:
+                pending.add(executor.submit(generateOne, level,
+                                            seeds.getrandbits(64), options))
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if index is not None and not index.add(result[0]):
+                    continue
+                produced += 1
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
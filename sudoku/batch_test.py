@@ -0,0 +1,42 @@
+"""
+Unit Tests for batch puzzle generation
+"""
+from batch import *
+import threading
+import unittest as u
+
+class BatchTest(u.TestCase):
+
+    def test_generateOne_is_reproducible(self):
+        first = generateOne(Game.EASY, 42, {})
+        second = generateOne(Game.EASY, 42, {})
+        self.assertEqual(first[0], second[0], "Testing same seed gives the same puzzle")
+        self.assertEqual(first[2]["seed"], 42, "Testing seed is reported")
+
+    def test_generateBatch(self):
+        results = list(generateBatch(Game.EASY, 4, workers=2, seed=1))
+        self.assertEqual(len(results), 4, "Testing the requested number of puzzles")
+        seeds = sorted(stats["seed"] for puzzle, solution, stats in results)
+        again = sorted(stats["seed"] for puzzle, solution, stats in
+                       generateBatch(Game.EASY, 4, workers=1, seed=1))
+        self.assertEqual(seeds, again, "Testing batch seeds do not depend on workers")
+
+    def test_generateBatch_unique(self):
+        index = DedupIndex()
+        results = list(generateBatch(Game.EASY, 3, workers=2, seed=3, unique=index))
+        self.assertEqual(len(results), 3, "Testing the requested number of puzzles")
+        self.assertEqual(len(index), 3, "Testing every puzzle yielded is indexed")
+        for puzzle, solution, stats in results:
+            self.assertTrue(puzzle in index, "Testing puzzles are in the index")
+
+    def test_generateBatch_cancel(self):
+        cancel = threading.Event()
+        results = []
+        for result in generateBatch(Game.EASY, 50, workers=1, seed=1, cancel=cancel):
+            results.append(result)
+            cancel.set()
+        self.assertTrue(len(results) < 50, "Testing cancelling stops the batch")
+
+
+if __name__ == "__main__":
+    u.main()
@@ -0,0 +1,224 @@
+"""
+This module computes the canonical form of a Sudoku board: the smallest
+board, read row by row, among all the boards equivalent to it under the
+Sudoku symmetry group (see symmetry.py), once its numbers are relabelled in
+order of first appearance. Blank entries (zeros) stay blank and come before
+every number.
+
+Two puzzles are the same puzzle in disguise iff they have the same canonical
+form, so the form (or its hash) can be used to deduplicate a puzzle store:
+
+    index = DedupIndex()
+    for puzzle, solution, stats in generateBatch(Game.HARD, 1000):
+        if index.add(puzzle):
+            store(puzzle, solution)
+
+The minimum is built one output row at a time. Only the partial
+transformations (transpose, rows chosen so far, column order, labels) that
+give the smallest rows so far are kept, so the 3 359 232 * 9! elements of
+the group are never enumerated; most of them are discarded by the first two
+rows. The column order is chosen one column at a time while building the
+first row. A puzzle takes a few milliseconds; a complete board takes longer
+(a few hundred), since relabelling makes every full first row look the same.
+
+Sparse boards tie on almost every partial transformation, so two of them
+are only kept apart when they can still lead to different boards: the
+all-blank rows (or columns) of a band (or stack) are interchangeable, as
+are the all-blank bands (or stacks), so only the first one left is tried;
+and partial transformations that differ only by the order of the rows
+already chosen are merged. Even an empty board then takes milliseconds.
+"""
+
+from hashlib import blake2b
+from symmetry import TRANSPOSE
+
+HASH_SIZE = 16
+
+
+def _flatten(board):
+    """ Returns the 81 entries of a 9x9 list of lists or of a flat board """
+    if len(board) == 81:
+        return list(board)
+    return [number for row in board for number in row]
+
+
+def _blankLines(grid):
+    """ Returns the set of the rows of a flat board that are all blanks """
+    return {row for row in range(9) if not any(grid[row*9:row*9 + 9])}
+
+
+def _skipped(line, used, blank):
+    """
+    Returns whether line (a row or a column) need not be tried next after
+    the used ones: an all-blank line is only tried if it is the first
+    unused all-blank line of its band, and an all-blank band only if it is
+    the first unused all-blank band
+    """
+    if line not in blank:
+        return False
+    band = line // 3
+    if any(other in blank and other not in used
+           for other in range(band*3, line)):
+        return True
+    if any(other // 3 == band for other in used) or \
+            not all(other in blank for other in range(band*3, band*3 + 3)):
+        return False
+    return any(all(other in blank and other not in used
+                   for other in range(earlier*3, earlier*3 + 3))
+               for earlier in range(band))
+
+
+def _firstRows(grids, blanks):
+    """
+    Returns the smallest first row and the (grid, rows, colOrder, labels,
+    nextLabel) states giving it, choosing the first row and the column
+    order of every grid; grid is an index of grids, and blanks holds the
+    blank rows and the blank columns of every grid
+    """
+    states = [(grid, (first,), (), [0] * 10, 1)
+              for grid in range(len(grids)) for first in range(9)
+              if not _skipped(first, (), blanks[grid][0])]
+    output = []
+    for position in range(9):
+        best = None
+        following = []
+        for grid, rows, colOrder, labels, nextLabel in states:
+            cells = grids[grid]
+            base = rows[0] * 9
+            if position % 3 == 0:
+                # Any column of a stack not used yet starts the next stack
+                used = {col // 3 for col in colOrder}
+                choices = [stack*3 + col for stack in range(3)
+                           if stack not in used for col in range(3)]
+            else:
+                stack = colOrder[-1] // 3
+                choices = [col for col in range(stack*3, stack*3 + 3)
+                           if col not in colOrder]
+            for col in choices:
+                if _skipped(col, colOrder, blanks[grid][1]):
+                    continue
+                number = cells[base + col]
+                value = labels[number] if number == 0 or labels[number] \
+                        else nextLabel
+                if best is None or value < best:
+                    best = value
+                    following = []
+                if value == best:
+                    if value == nextLabel and number != 0:
+                        newLabels = labels[:]
+                        newLabels[number] = nextLabel
+                        following.append((grid, rows, colOrder + (col,),
+                                          newLabels, nextLabel + 1))
+                    else:
+                        following.append((grid, rows, colOrder + (col,),
+                                          labels, nextLabel))
+        output.append(best)
+        states = following
+    return output, states
+
+
+def _nextRows(rows, blank):
+    """ Returns the rows that may follow the given ones """
+    if len(rows) % 3 == 0:
+        used = {row // 3 for row in rows}
+        choices = [band*3 + row for band in range(3) if band not in used
+                   for row in range(3)]
+    else:
+        band = rows[-1] // 3
+        choices = [row for row in range(band*3, band*3 + 3)
+                   if row not in rows]
+    return [row for row in choices if not _skipped(row, rows, blank)]
+
+
+def canonicalize(board):
+    """
+    Takes a board (a 9x9 list of lists or 81 flat entries, zeros for
+    blanks) and returns its canonical form as a new 9x9 list of lists
+    """
+    cells = _flatten(board)
+    grids = (cells, [cells[index] for index in TRANSPOSE])
+    # The blank columns of a grid are the blank rows of the other one
+    blankRows = [_blankLines(grid) for grid in grids]
+    blanks = ((blankRows[0], blankRows[1]), (blankRows[1], blankRows[0]))
+    firstRow, states = _firstRows(grids, blanks)
+    result = [firstRow]
+    for _ in range(8):
+        best = None
+        following = []
+        seen = set()
+        for grid, rows, colOrder, labels, nextLabel in states:
+            cells = grids[grid]
+            for row in _nextRows(rows, blanks[grid][0]):
+                base = row * 9
+                newLabels = labels
+                label = nextLabel
+                output = []
+                for col in colOrder:
+                    number = cells[base + col]
+                    if number != 0 and newLabels[number] == 0:
+                        if newLabels is labels:
+                            newLabels = labels[:]
+                        newLabels[number] = label
+                        label += 1
+                    output.append(newLabels[number])
+                if best is None or output < best:
+                    best = output
+                    following = []
+                    seen = set()
+                if output == best:
+                    # Only which rows are left matters from now on, not
+                    # the order the chosen ones came in
+                    key = (grid, frozenset(rows + (row,)), colOrder,
+                           tuple(newLabels))
+                    if key not in seen:
+                        seen.add(key)
+                        following.append((grid, rows + (row,), colOrder,
+                                          newLabels, label))
+        result.append(best)
+        states = following
+    return result
+
+
+def canonicalKey(board):
+    """
+    Returns the canonical form of a board as 81 bytes
+    """
+    return bytes(number for row in canonicalize(board) for number in row)
+
+
+def canonicalHash(board):
+    """
+    Returns a short hash (HASH_SIZE bytes) of the canonical form of a board;
+    equivalent boards, and only those in practice, share the same hash
+    """
+    return blake2b(canonicalKey(board), digest_size=HASH_SIZE).digest()
+
+
+class DedupIndex:
+    """
+    Set of the canonical hashes of the boards seen so far
+    """
+
+    def __init__(self, boards=()):
+        """ Creates an index holding the given boards """
+        self.hashes = set()
+        for board in boards:
+            self.add(board)
+
+    def add(self, board):
+        """
+        Adds a board to the index
+
+        return: True iff no equivalent board was in the index
+        """
+        key = canonicalHash(board)
+        if key in self.hashes:
+            return False
+        self.hashes.add(key)
+        return True
+
+    def __contains__(self, board):
+        return canonicalHash(board) in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
@@ -0,0 +1,63 @@
+"""
+Unit Tests for canonical forms and deduplication
+"""
+from canonical import *
+from symmetry import randomTransform, ROTATE90, applyToBoard
+from fixtures import BOARD
+import random
+import unittest as u
+
+class CanonicalTest(u.TestCase):
+
+    def test_equivalent_boards(self):
+        rng = random.Random(1)
+        canonical = canonicalize(BOARD)
+        cells = [number for row in BOARD for number in row]
+        for _ in range(10):
+            self.assertEqual(canonicalize(randomTransform(cells, rng)), canonical,\
+            "Testing transformed puzzles share the canonical form")
+        self.assertEqual(canonicalize(applyToBoard(ROTATE90, BOARD)), canonical,\
+        "Testing a rotated puzzle shares the canonical form")
+
+    def test_canonical_form(self):
+        canonical = canonicalize(BOARD)
+        self.assertEqual(canonicalize(canonical), canonical, "Testing the form is a fixed point")
+        self.assertEqual(sum(number == 0 for row in canonical for number in row),\
+        sum(number == 0 for row in BOARD for number in row), "Testing blanks are kept")
+        self.assertTrue(canonical <= BOARD, "Testing the form is minimal")
+
+    def test_sparse_boards(self):
+        empty = [[0] * 9 for _ in range(9)]
+        self.assertEqual(canonicalize(empty), empty, "Testing the empty board")
+        rng = random.Random(3)
+        cells = [number for row in BOARD for number in row]
+        for count in (1, 2, 3, 9):
+            kept = set(rng.sample([cell for cell in range(81) if cells[cell]], count))
+            sparse = [cells[cell] if cell in kept else 0 for cell in range(81)]
+            self.assertEqual(canonicalize(randomTransform(sparse, rng)), canonicalize(sparse),\
+            "Testing transformed sparse boards share the canonical form")
+        line = [[0] * 9 for _ in range(9)]
+        line[4] = [5, 8, 1, 3, 2, 7, 9, 6, 4]
+        self.assertEqual(canonicalize(line)[-1], list(range(1, 10)),\
+        "Testing a single full row ends the form")
+
+    def test_different_puzzles(self):
+        other = [row[:] for row in BOARD]
+        other[0][1] = 4
+        self.assertNotEqual(canonicalHash(other), canonicalHash(BOARD),\
+        "Testing a different puzzle gets a different hash")
+
+    def test_dedup_index(self):
+        rng = random.Random(2)
+        cells = [number for row in BOARD for number in row]
+        index = DedupIndex([BOARD])
+        self.assertFalse(index.add(randomTransform(cells, rng)), "Testing duplicate is rejected")
+        self.assertTrue(randomTransform(cells, rng) in index, "Testing membership")
+        other = [row[:] for row in BOARD]
+        other[0][1] = 4
+        self.assertTrue(index.add(other), "Testing new puzzle is added")
+        self.assertEqual(len(index), 2, "Testing index size")
+
+
+if __name__ == "__main__":
+    u.main()
@@ -0,0 +1,408 @@
+"""
+This module contains the Constraints class used by the Sudoku board to keep
+track of which numbers are already used in every row, column and 3x3 grid.
+
+Each of the 27 units is stored as a 9-bit mask where bit (n-1) is set iff
+the number n is present in that unit. Placing or clearing an entry only
+updates three masks, and checking whether a number is allowed in a given
+location becomes a single AND instead of scanning up to 27 entries.
+
+Entries are also numbered from 0 to 80 in row-major order (cell = row*9 + col)
+when a single index is more convenient. The board itself is stored that way,
+as a flat bytearray of 81 numbers; toCells and toBoard convert between that
+layout and the 9x9 list of lists used by the rest of the game.
+
+The masks assume the board never holds the same number twice in a unit,
+which is always the case for boards explored by the search. A player's board
+may break that rule: clearing one of two equal numbers is followed by
+markHeld, and Occupancy keeps the cells holding every number of every unit
+and sets entries through Constraints only when that is safe.
+"""
+
+from array import array
+
+ALL_DIGITS = 0x1FF
+
+# BOX[row][col] is the index (0 to 8) of the 3x3 grid containing the entry,
+# counting horizontally from the top-left grid
+BOX = [[(row//3)*3 + col//3 for col in range(9)] for row in range(9)]
+
+# Number of candidates in every possible mask
+POPCOUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+
+def _peers(cell):
+    """ Returns the 20 other cells sharing a row, column or grid with cell """
+    row, col = divmod(cell, 9)
+    result = []
+    for other in range(81):
+        otherRow, otherCol = divmod(other, 9)
+        if other != cell and (otherRow == row or otherCol == col or
+                BOX[otherRow][otherCol] == BOX[row][col]):
+            result.append(other)
+    return result
+
+PEERS = [_peers(cell) for cell in range(81)]
+
+# Row, column and grid of every cell
+ROW_OF = [cell // 9 for cell in range(81)]
+COL_OF = [cell % 9 for cell in range(81)]
+BOX_OF = [BOX[cell // 9][cell % 9] for cell in range(81)]
+
+# The cells of the 27 units: rows 0-8, then columns 0-8, then grids 0-8
+ROW_UNITS = [[row*9 + col for col in range(9)] for row in range(9)]
+COL_UNITS = [[row*9 + col for row in range(9)] for col in range(9)]
+BOX_UNITS = [[cell for cell in range(81) if BOX_OF[cell] == box]
+             for box in range(9)]
+UNITS = ROW_UNITS + COL_UNITS + BOX_UNITS
+
+# Indices in UNITS of the row, column and grid of every cell
+UNITS_OF = [(ROW_OF[cell], 9 + COL_OF[cell], 18 + BOX_OF[cell])
+            for cell in range(81)]
+
+
+def toCells(board):
+    """
+    Returns a new flat bytearray of the 81 entries of a 9x9 list of lists
+    """
+    cells = bytearray(81)
+    for row in range(9):
+        cells[row*9:row*9 + 9] = bytes(board[row])
+    return cells
+
+
+def toBoard(cells):
+    """
+    Returns a new 9x9 list of lists holding the 81 entries of a flat board
+    """
+    return [list(cells[row*9:row*9 + 9]) for row in range(9)]
+
+
+def digitBit(number):
+    """ Returns the mask bit used to represent a number from 1 to 9 """
+    return 1 << (number - 1)
+
+
+def digitsOf(mask):
+    """ Returns the list of numbers (1 to 9) whose bits are set in mask """
+    return [number for number in range(1, 10) if mask & (1 << (number - 1))]
+
+
+class Constraints:
+    """
+    Per-row, per-column and per-grid bitmasks of the numbers used on a
+    Sudoku board.
+
+    With trackCounts set, the number of candidates left for every blank
+    entry is kept up to date as entries are placed and cleared, so the most
+    constrained entry can be found without recomputing any mask.
+
+    Candidates can also be eliminated from a single entry (e.g. by pointing
+    pairs); those eliminations are kept per cell until they are restored.
+    """
+
+    ROWS = COLUMNS = 9
+
+    __slots__ = ("rows", "cols", "boxes", "cells", "eliminated", "blanks",
+                 "trackCounts", "counts")
+
+    def __init__(self, board=None, trackCounts=False):
+        """
+        Creates the masks for the given board, where blank entries are zeros.
+        The board is either a 9x9 list of lists, which is copied, or a flat
+        bytearray of 81 entries, which is used (and updated) directly.
+        Without a board every unit starts empty.
+        """
+        self.rows = [0] * self.ROWS
+        self.cols = [0] * self.COLUMNS
+        self.boxes = [0] * 9
+        if board is None:
+            self.cells = bytearray(81)
+        elif isinstance(board, bytearray):
+            self.cells = board
+        else:
+            self.cells = toCells(board)
+        self.eliminated = array("H", bytes(162))
+        self.blanks = 81
+        self.trackCounts = trackCounts
+        for cell in range(81):
+            number = self.cells[cell]
+            if number != 0:
+                bit = 1 << (number - 1)
+                self.rows[ROW_OF[cell]] |= bit
+                self.cols[COL_OF[cell]] |= bit
+                self.boxes[BOX_OF[cell]] |= bit
+                self.blanks -= 1
+        self.counts = None
+        if trackCounts:
+            self.recount()
+
+    def copy(self):
+        """ Returns an independent copy of the masks and cells """
+        other = Constraints.__new__(Constraints)
+        other.rows = self.rows[:]
+        other.cols = self.cols[:]
+        other.boxes = self.boxes[:]
+        other.cells = self.cells[:]
+        other.eliminated = self.eliminated[:]
+        other.blanks = self.blanks
+        other.trackCounts = self.trackCounts
+        other.counts = None
+        if self.counts is not None:
+            other.counts = self.counts[:]
+        return other
+
+    def recount(self):
+        """ Recomputes the candidate count of every blank entry """
+        self.trackCounts = True
+        self.counts = bytearray(81)
+        for cell in range(81):
+            if self.cells[cell] == 0:
+                row, col = divmod(cell, 9)
+                self.counts[cell] = POPCOUNT[self.candidates(row, col)]
+
+    def place(self, row, col, number):
+        """ Marks number as used in the row, column and grid of the entry """
+        bit = 1 << (number - 1)
+        cell = row*9 + col
+        if self.trackCounts:
+            self.__updatePeerCounts(cell, bit, -1)
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[BOX[row][col]] |= bit
+        self.cells[cell] = number
+        self.blanks -= 1
+
+    def clear(self, row, col, number):
+        """ Marks number as no longer used by the entry at row, col """
+        bit = 1 << (number - 1)
+        cell = row*9 + col
+        self.rows[row] &= ~bit
+        self.cols[col] &= ~bit
+        self.boxes[BOX[row][col]] &= ~bit
+        self.cells[cell] = 0
+        self.blanks += 1
+        if self.trackCounts:
+            self.__updatePeerCounts(cell, bit, 1)
+            self.counts[cell] = POPCOUNT[self.candidates(row, col)]
+
+    def markHeld(self, row, col, number):
+        """
+        Marks number as used again in the units of the entry that still
+        hold it in another entry (a board breaking the rules), e.g. after
+        clearing one of two equal numbers of a unit
+
+        return: True iff some unit was marked again
+        """
+        bit = 1 << (number - 1)
+        cells = self.cells
+        masks = (self.rows, self.cols, self.boxes)
+        marked = False
+        for family, unit in enumerate(UNITS_OF[row*9 + col]):
+            if any(cells[cell] == number for cell in UNITS[unit]):
+                masks[family][unit - 9*family] |= bit
+                marked = True
+        if marked and self.trackCounts:
+            self.recount()
+        return marked
+
+    def __updatePeerCounts(self, cell, bit, delta):
+        """
+        Adds delta to the count of every blank peer of cell for which the
+        number represented by bit is (still) a candidate
+        """
+        cells = self.cells
+        counts = self.counts
+        eliminated = self.eliminated
+        rows = self.rows
+        cols = self.cols
+        boxes = self.boxes
+        for peer in PEERS[cell]:
+            if cells[peer] == 0:
+                if not ((rows[ROW_OF[peer]] | cols[COL_OF[peer]] |
+                         boxes[BOX_OF[peer]] | eliminated[peer]) & bit):
+                    counts[peer] += delta
+
+    def used(self, row, col):
+        """ Returns the mask of numbers already present around the entry """
+        return self.rows[row] | self.cols[col] | self.boxes[BOX[row][col]]
+
+    def candidates(self, row, col):
+        """ Returns the mask of numbers still allowed at the entry """
+        return ~(self.used(row, col) | self.eliminated[row*9 + col]) & ALL_DIGITS
+
+    def cellCandidates(self, cell):
+        """ Same as candidates but for a cell index from 0 to 80 """
+        return ~(self.rows[ROW_OF[cell]] | self.cols[COL_OF[cell]] |
+                 self.boxes[BOX_OF[cell]] | self.eliminated[cell]) & ALL_DIGITS
+
+    def eliminate(self, cell, mask):
+        """
+        Removes the numbers in mask from the candidates of a blank cell
+
+        return: the mask of numbers that actually were candidates
+        """
+        removed = mask & self.cellCandidates(cell)
+        if removed:
+            self.eliminated[cell] |= removed
+            if self.trackCounts:
+                self.counts[cell] -= POPCOUNT[removed]
+        return removed
+
+    def restore(self, cell, mask):
+        """ Undoes an elimination returned by eliminate """
+        self.eliminated[cell] &= ~mask
+        if self.trackCounts:
+            self.counts[cell] += POPCOUNT[mask]
+
+    def isAllowed(self, row, col, number):
+        """
+        return: True iff number is not already present in the row, column
+        or 3x3 grid of the entry
+        """
+        return not ((self.rows[row] | self.cols[col] |
+                     self.boxes[BOX[row][col]]) & (1 << (number - 1)))
+
+    def mostConstrained(self):
+        """
+        Returns the (row, col) of the blank entry with the fewest candidates
+        (the first one in row-major order on ties) or None if there is no
+        blank entry left. Requires trackCounts.
+        """
+        best = None
+        bestCount = 10
+        cells = self.cells
+        counts = self.counts
+        for cell in range(81):
+            if cells[cell] == 0 and counts[cell] < bestCount:
+                best = cell
+                bestCount = counts[cell]
+                if bestCount <= 1:
+                    break
+        if best is None:
+            return None
+        return divmod(best, 9)
+
+
+class Occupancy:
+    """
+    The set of cells holding each number in each of the 27 units of a board,
+    which unlike the masks may hold the same number twice (a player's
+    mistake).
+
+    Entries are changed through set, which keeps the masks of the wrapped
+    Constraints equal to the numbers present in every unit: when a number
+    is alone in its three units the usual place and clear are used,
+    otherwise the masks are patched and the candidate counts recomputed.
+    """
+
+    __slots__ = ("constraints", "holders", "duplicates")
+
+    def __init__(self, constraints):
+        """ Indexes the entries of the board held by constraints """
+        self.constraints = constraints
+        # holders[unit*10 + number] is the set of cells of unit holding number
+        self.holders = [set() for i in range(270)]
+        # Number of (unit, number) pairs held by more than one cell
+        self.duplicates = 0
+        cells = constraints.cells
+        for cell in range(81):
+            if cells[cell] != 0:
+                self.__add(cell, cells[cell])
+
+    def __add(self, cell, number):
+        """
+        Records that cell holds number
+
+        return: True iff no other cell of its units holds number
+        """
+        alone = True
+        for unit in UNITS_OF[cell]:
+            holders = self.holders[unit*10 + number]
+            if holders:
+                alone = False
+                if len(holders) == 1:
+                    self.duplicates += 1
+            holders.add(cell)
+        return alone
+
+    def __remove(self, cell, number):
+        """
+        Records that cell no longer holds number
+
+        return: True iff no other cell of its units holds number
+        """
+        alone = True
+        for unit in UNITS_OF[cell]:
+            holders = self.holders[unit*10 + number]
+            holders.discard(cell)
+            if holders:
+                alone = False
+                if len(holders) == 1:
+                    self.duplicates -= 1
+        return alone
+
+    def set(self, cell, number):
+        """
+        Sets the entry of cell (0 to 80) to number (0 to blank it)
+
+        return: the set of cells of conflicts(cell) after the change
+        """
+        constraints = self.constraints
+        previous = constraints.cells[cell]
+        if previous == number:
+            return self.conflicts(cell)
+        row, col = divmod(cell, 9)
+        if previous != 0:
+            if self.__remove(cell, previous):
+                constraints.clear(row, col, previous)
+            else:
+                # Other cells still hold previous: only unset the units
+                # left without it
+                bit = 1 << (previous - 1)
+                holders = self.holders
+                if not holders[row*10 + previous]:
+                    constraints.rows[row] &= ~bit
+                if not holders[(9 + col)*10 + previous]:
+                    constraints.cols[col] &= ~bit
+                if not holders[(18 + BOX_OF[cell])*10 + previous]:
+                    constraints.boxes[BOX_OF[cell]] &= ~bit
+                constraints.cells[cell] = 0
+                constraints.blanks += 1
+                if constraints.trackCounts:
+                    constraints.recount()
+        if number != 0:
+            if self.__add(cell, number):
+                constraints.place(row, col, number)
+            else:
+                bit = 1 << (number - 1)
+                constraints.rows[row] |= bit
+                constraints.cols[col] |= bit
+                constraints.boxes[BOX_OF[cell]] |= bit
+                constraints.cells[cell] = number
+                constraints.blanks -= 1
+                if constraints.trackCounts:
+                    constraints.recount()
+        return self.conflicts(cell)
+
+    def conflicts(self, cell):
+        """
+        Returns the set of cells holding the same number as cell in one of
+        its units, including cell itself (empty if there are none)
+        """
+        number = self.constraints.cells[cell]
+        result = set()
+        if number != 0:
+            for unit in UNITS_OF[cell]:
+                holders = self.holders[unit*10 + number]
+                if len(holders) > 1:
+                    result |= holders
+        return result
+
+    def allConflicts(self):
+        """ Returns the set of every cell sharing its number with a peer """
+        result = set()
+        if self.duplicates:
+            for holders in self.holders:
+                if len(holders) > 1:
+                    result |= holders
+        return result
@@ -0,0 +1,43 @@
+"""
+Unit Tests for the Constraints class
+"""
+from constraints import *
+import unittest as u
+
+class ConstraintsTest(u.TestCase):
+
+    def setUp(self):
+        self.board = [[0 for j in range(9)] for i in range(9)]
+        self.board[0][0] = 5
+        self.board[4][7] = 3
+        self.constraints = Constraints(self.board)
+
+    def test_masks_from_board(self):
+        self.assertEqual(self.constraints.rows[0], digitBit(5), "Row mask built from board")
+        self.assertEqual(self.constraints.cols[7], digitBit(3), "Col mask built from board")
+        self.assertEqual(self.constraints.boxes[5], digitBit(3), "Grid mask built from board")
+
+    def test_isAllowed(self):
+        self.assertFalse(self.constraints.isAllowed(0, 8, 5), "Number used in row")
+        self.assertFalse(self.constraints.isAllowed(8, 0, 5), "Number used in col")
+        self.assertFalse(self.constraints.isAllowed(3, 6, 3), "Number used in grid")
+        self.assertTrue(self.constraints.isAllowed(8, 8, 5), "Number free everywhere")
+
+    def test_place_and_clear(self):
+        self.constraints.place(8, 8, 9)
+        self.assertFalse(self.constraints.isAllowed(8, 0, 9), "Placed number blocks its row")
+        self.constraints.clear(8, 8, 9)
+        self.assertTrue(self.constraints.isAllowed(8, 0, 9), "Cleared number is allowed again")
+
+    def test_candidates(self):
+        self.assertEqual(digitsOf(self.constraints.candidates(0, 7)),
+            [1, 2, 4, 6, 7, 8, 9], "Candidates exclude row and col numbers")
+
+    def test_copy_is_independent(self):
+        other = self.constraints.copy()
+        other.place(8, 8, 9)
+        self.assertTrue(self.constraints.isAllowed(8, 8, 9), "Copy does not share masks")
+
+
+if __name__ == "__main__":
+    u.main()
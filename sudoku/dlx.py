@@ -0,0 +1,263 @@
+"""
+This module contains a second solver engine for Sudoku boards, based on
+Knuth's Algorithm X with Dancing Links.
+
+Sudoku is modelled as an exact cover problem:
+    * 729 rows, one for every (row, col, number) choice
+    * 324 constraints (columns) that must be covered exactly once:
+        -   0 to  80  entry (row, col) holds a number
+        -  81 to 161  row holds number
+        - 162 to 242  col holds number
+        - 243 to 323  3x3 grid holds number
+
+Every choice covers exactly four constraints. The links are kept in flat
+lists (left, right, up, down and column of every node) built once for the
+empty board and copied for every search, so no objects are allocated while
+searching. The search always branches on the first column with the fewest
+rows left, which makes it deterministic.
+
+DancingLinks offers the same surface as Search in search_problem.py:
+getNumSolns, getFirstSolution, getStats and countSolutions.
+"""
+
+import time
+from constraints import BOX
+
+NUM_COLUMNS = 324
+
+
+def _choiceColumns(row, col, number):
+    """ Returns the four constraint columns (1 to 324) covered by a choice """
+    digit = number - 1
+    return (1 + row*9 + col,
+            1 + 81 + row*9 + digit,
+            1 + 162 + col*9 + digit,
+            1 + 243 + BOX[row][col]*9 + digit)
+
+
+def _buildLinks():
+    """
+    Builds the links of the full exact cover matrix.
+    Node 0 is the root, nodes 1 to 324 the column headers and every choice
+    then adds four nodes.
+    """
+    left = list(range(-1, NUM_COLUMNS))
+    right = list(range(1, NUM_COLUMNS + 2))
+    left[0] = NUM_COLUMNS
+    right[NUM_COLUMNS] = 0
+    up = list(range(NUM_COLUMNS + 1))
+    down = list(range(NUM_COLUMNS + 1))
+    column = list(range(NUM_COLUMNS + 1))
+    size = [0] * (NUM_COLUMNS + 1)
+    choiceOf = [None] * (NUM_COLUMNS + 1)
+    firstNode = {}
+
+    for row in range(9):
+        for col in range(9):
+            for number in range(1, 10):
+                first = len(column)
+                firstNode[(row, col, number)] = first
+                for offset, header in enumerate(_choiceColumns(row, col, number)):
+                    node = first + offset
+                    # Link horizontally into a circular list of four nodes
+                    left.append(first + (offset - 1) % 4)
+                    right.append(first + (offset + 1) % 4)
+                    # Link vertically at the bottom of the column
+                    up.append(up[header])
+                    down.append(header)
+                    down[up[header]] = node
+                    up[header] = node
+                    column.append(header)
+                    choiceOf.append((row, col, number))
+                    size[header] += 1
+
+    return left, right, up, down, column, size, choiceOf, firstNode
+
+_LINKS = _buildLinks()
+
+
+class DancingLinks:
+    """
+    Counts (and records the first of) the solutions of a Sudoku board using
+    Algorithm X on a Dancing Links matrix. The search runs when the instance
+    is created, like Search, and stops once limit solutions are found.
+    """
+    total_solns = 0
+
+    def __init__(self, board, limit=None, hooks=None):
+        """
+        Takes a 9x9 list of lists where blank entries are zeros.
+        hooks (see hooks.py) only receive onSearchDone, as the matrix has
+        no Sudoku state to hand to the per-node callbacks.
+        """
+        left, right, up, down, column, size, choiceOf, firstNode = _LINKS
+        self.left = left[:]
+        self.right = right[:]
+        self.up = up[:]
+        self.down = down[:]
+        self.size = size[:]
+        self.column = column
+        self.choiceOf = choiceOf
+        self.limit = limit
+        self.nodesExpanded = 0
+        self.backtracks = 0
+        self.maxFrontier = 0
+        self.firstSolution = None
+        self.board = [row[:] for row in board]
+        self.chosen = []
+
+        start = time.perf_counter()
+        if self.placeGivens(firstNode):
+            self.search()
+        self.wallTime = time.perf_counter() - start
+        if hooks is not None:
+            hooks.onSearchDone(self.getStats())
+
+    @staticmethod
+    def countSolutions(board, limit=2, hooks=None):
+        """
+        Counts the solutions of board, stopping once limit solutions are found.
+
+        return: a (count, stats) tuple where count is at most limit and
+        stats is the dictionary returned by getStats
+        """
+        dlx = DancingLinks(board, limit=limit, hooks=hooks)
+        return dlx.getNumSolns(), dlx.getStats()
+
+    def getNumSolns(self):
+        """
+        Returns total number of solutions found
+        """
+        return self.total_solns
+
+    def getFirstSolution(self):
+        """
+        Returns the first solution found as a 9x9 list of lists, or None
+        """
+        return self.firstSolution
+
+    def getStats(self):
+        """
+        Returns a dictionary with statistics about the search
+        """
+        return {
+            "solutions": self.total_solns,
+            "nodesExpanded": self.nodesExpanded,
+            "backtracks": self.backtracks,
+            "maxFrontier": self.maxFrontier,
+            "wallTime": self.wallTime,
+            "limitReached": self.limitReached(),
+        }
+
+    def limitReached(self):
+        """
+        Returns whether the search stopped because of its solution limit
+        """
+        return self.limit is not None and self.total_solns >= self.limit
+
+    def cover(self, header):
+        """ Removes a column and every row intersecting it from the matrix """
+        left, right, up, down, column, size = \
+            self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header):
+        """ Undoes cover, in the exact reverse order """
+        left, right, up, down, column, size = \
+            self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def placeGivens(self, firstNode):
+        """
+        Selects the rows of the entries already filled on the board.
+
+        return: False if two givens cover the same constraint, i.e. the
+        board breaks the rules and has no solution
+        """
+        covered = set()
+        for row in range(9):
+            for col in range(9):
+                number = self.board[row][col]
+                if number != 0:
+                    node = firstNode[(row, col, number)]
+                    for offset in range(4):
+                        header = self.column[node + offset]
+                        if header in covered:
+                            return False
+                        covered.add(header)
+                        self.cover(header)
+        return True
+
+    def search(self):
+        """
+        Recursive Algorithm X: branch on the column with the fewest rows,
+        try each of its rows and backtrack
+        """
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            self.total_solns += 1
+            if self.firstSolution is None:
+                self.firstSolution = self.buildSolution()
+            return
+
+        header = right[0]
+        best = header
+        while header != 0:
+            if size[header] < size[best]:
+                best = header
+                if size[best] <= 1:
+                    break
+            header = right[header]
+        if size[best] == 0:
+            self.backtracks += 1
+            return
+
+        self.nodesExpanded += 1
+        if len(self.chosen) + 1 > self.maxFrontier:
+            self.maxFrontier = len(self.chosen) + 1
+        self.cover(best)
+        i = down[best]
+        while i != best:
+            self.chosen.append(i)
+            j = right[i]
+            while j != i:
+                self.cover(self.column[j])
+                j = right[j]
+            self.search()
+            j = self.left[i]
+            while j != i:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            self.chosen.pop()
+            if self.limitReached():
+                break
+            i = down[i]
+        self.uncover(best)
+
+    def buildSolution(self):
+        """ Returns the board completed with the rows currently chosen """
+        solution = [row[:] for row in self.board]
+        for node in self.chosen:
+            row, col, number = self.choiceOf[node]
+            solution[row][col] = number
+        return solution
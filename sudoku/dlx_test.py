@@ -0,0 +1,54 @@
+"""
+Unit Tests for the DancingLinks solver
+"""
+from dlx import *
+from sudoku import *
+import unittest as u
+
+class DancingLinksTest(u.TestCase):
+
+    def setUp(self):
+        board = [[0 for j in range(9)] for i in range(9)]
+        board[0] = [ 3, 4, 8, 7, 1, 2, 9, 6, 5]
+        board[3] = [ 4, 9, 7, 1, 3, 5, 6, 2, 8]
+        board[4] = [ 5, 6, 3, 8, 2, 7, 1, 9, 4]
+        board[6] = [ 7, 3, 9, 2, 8, 1, 5, 4, 6]
+        board[7] = [ 6, 2, 4, 3, 5, 9, 8, 7, 1]
+        board[8] = [ 1, 8, 5, 6, 7, 4, 2, 3, 9]
+        self.board = board
+
+    def test_count(self):
+        dlx = DancingLinks(self.board)
+        self.assertEqual(dlx.getNumSolns(), 12, "Testing number of solutions")
+
+    def test_count_matches_search(self):
+        search = Search(Sudoku(copy.deepcopy(self.board)))
+        self.assertEqual(DancingLinks(self.board).getNumSolns(), search.getNumSolns(),\
+        "Testing both engines agree")
+
+    def test_countSolutions_limit(self):
+        count, stats = DancingLinks.countSolutions(self.board, limit=2)
+        self.assertEqual(count, 2, "Testing count stops at the limit")
+        self.assertTrue(stats["limitReached"], "Testing stats report the limit")
+
+    def test_first_solution(self):
+        solution = DancingLinks(self.board, limit=1).getFirstSolution()
+        self.assertTrue(Sudoku(solution).isDone(), "Testing first solution is complete")
+        for row in range(9):
+            for col in range(9):
+                if self.board[row][col] != 0:
+                    self.assertEqual(solution[row][col], self.board[row][col],\
+                    "Testing first solution keeps the givens")
+
+    def test_empty_board(self):
+        count, stats = DancingLinks.countSolutions([[0]*9 for i in range(9)], limit=5)
+        self.assertEqual(count, 5, "Testing empty board has many solutions")
+
+    def test_invalid_board(self):
+        self.board[1][0] = 3
+        self.assertEqual(DancingLinks(self.board).getNumSolns(), 0,\
+        "Testing a board breaking the rules has no solution")
+
+
+if __name__ == "__main__":
+    u.main()
@@ -0,0 +1,36 @@
+"""
+Boards shared by the unit tests: the example puzzle of sudoku.py and its
+solution. Naked and hidden singles are enough to solve the puzzle.
+
+Tests must copy a board before changing it.
+"""
+
+BOARD = \
+[
+    [1, 0, 6,   0, 0, 2,   3, 0, 0],
+    [0, 5, 0,   0, 0, 6,   0, 9, 1],
+    [0, 0, 9,   5, 0, 1,   4, 6, 2],
+
+    [0, 3, 7,   9, 0, 5,   0, 0, 0],
+    [5, 8, 1,   0, 2, 7,   9, 0, 0],
+    [0, 0, 0,   4, 0, 8,   1, 5, 7],
+
+    [0, 0, 0,   2, 6, 0,   5, 4, 0],
+    [0, 0, 4,   1, 5, 0,   6, 0, 9],
+    [9, 0, 0,   8, 7, 4,   2, 1, 0],
+]
+
+SOLUTION = \
+[
+    [1, 4, 6,   7, 9, 2,   3, 8, 5],
+    [2, 5, 8,   3, 4, 6,   7, 9, 1],
+    [3, 7, 9,   5, 8, 1,   4, 6, 2],
+
+    [4, 3, 7,   9, 1, 5,   8, 2, 6],
+    [5, 8, 1,   6, 2, 7,   9, 3, 4],
+    [6, 9, 2,   4, 3, 8,   1, 5, 7],
+
+    [7, 1, 3,   2, 6, 9,   5, 4, 8],
+    [8, 2, 4,   1, 5, 3,   6, 7, 9],
+    [9, 6, 5,   8, 7, 4,   2, 1, 3],
+]
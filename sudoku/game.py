@@ -3,18 +3,43 @@ This class combines the Sudoku and SudokuPuzzleGen to randomly
 generate a Sudoku Board.
 """
 import copy
-from random import randint, shuffle
 from sudoku import *
 from generator import *
+from propagation import Propagator
+from dlx import DancingLinks
+from constraints import Occupancy
+from hints import findHint, findMistakes
+from rating import Rater, TIER_SIZE
 
 class Game(Sudoku):
 
     EASY = 0
     MEDIUM = 1
     HARD = 2
-    MAX_TRIES = 5
 
-    def __init__(self, level):
+    # Engines used to check that a puzzle has a unique solution
+    SEARCH = "search"   # backtracking Search (search_problem.py)
+    DLX = "dlx"         # Dancing Links exact cover (dlx.py)
+
+    # Naked and hidden singles settle most of the boards checked while
+    # removing values without any branching
+    SINGLES = Propagator()
+
+    # Difficulty score (see rating.py) band [low, high) targeted by every
+    # level when rated is set: naked singles only, hidden singles, then
+    # anything harder (high is None for no limit)
+    SCORE_BANDS = {EASY: (0, TIER_SIZE), MEDIUM: (TIER_SIZE, 2*TIER_SIZE),
+                   HARD: (2*TIER_SIZE, None)}
+
+    # Number of shuffles tried by a rated game before giving up
+    RATED_ATTEMPTS = 20
+
+    # Shared by every game, so its cache of intermediate boards is too
+    RATER = Rater()
+
+    def __init__(self, level, inPlace=True, branching=Sudoku.MRV,
+                 propagation=SINGLES, engine=SEARCH, hooks=None, rng=None,
+                 cancel=None, rated=False):
         """
         Starts a Sudoku Game based on the level chosen
 
@@ -22,73 +47,324 @@ class Game(Sudoku):
             0 - Easy
             1 - Medium
             2 - Hard
+
+        inPlace selects whether the uniqueness checks run the search on a
+        single board (making and unmaking moves) or copy the board for
+        every successor, branching the entry those searches fill next
+        (Sudoku.MRV or Sudoku.FIRST_BLANK) and propagation the Propagator
+        they run after every move (None for plain backtracking).
+        engine selects the solver used for the checks (SEARCH or DLX); the
+        three options above only apply to SEARCH.
+        hooks (see hooks.py) are passed to every uniqueness check and told
+        about every value removed or kept while carving the puzzle.
+        rng is a random.Random or a seed (see generator.makeRng) used for
+        every random choice, so the same seed always gives the same game
+        cancel is an optional flag (e.g. a threading.Event) checked before
+        every removal and during every SEARCH check; once it is set the
+        generation raises SearchCancelled
+        rated carves the puzzle as far as the SCORE_BANDS of the level
+        allow instead of removing a number of values chosen by
+        generateValuesToRemove
         """
+        self.setOptions(inPlace, branching, propagation, engine, hooks, rng,
+                        cancel, rated)
         self.solution = self.generateSolution()
-        self.initPuzzle = self.generatePuzzle(level)
-        initBoard = copy.deepcopy(self.initPuzzle)
-        Sudoku.__init__(self, initBoard)
+        self.initPuzzle = self.generatePuzzle(level, self.rng)
+        Sudoku.__init__(self, toCells(self.initPuzzle),
+                        propagation=propagation)
+        self.startMoves()
+
+    @classmethod
+    def fromPuzzle(cls, puzzle, solution, inPlace=True, branching=Sudoku.MRV,
+                   propagation=SINGLES, engine=SEARCH, hooks=None, rng=None,
+                   cancel=None, rated=False):
+        """
+        Starts a Game on an existing puzzle and its solution (9x9 lists of
+        lists) without generating anything. The options are those of
+        __init__.
+        """
+        game = cls.__new__(cls)
+        game.setOptions(inPlace, branching, propagation, engine, hooks, rng,
+                        cancel, rated)
+        game.solution = solution
+        game.initPuzzle = puzzle
+        Sudoku.__init__(game, toCells(puzzle), propagation=propagation)
+        game.startMoves()
+        return game
 
-    def generateValuesToRemove(self, level):
+    @classmethod
+    def fromBank(cls, bank, level, rng=None, **options):
+        """
+        Starts a Game on a random puzzle of the given level drawn from a
+        PuzzleBank (see bank.py), which only reads that one puzzle
+        """
+        rng = makeRng(rng)
+        puzzle, solution, stats = bank.draw(level, rng)
+        return cls.fromPuzzle(puzzle, solution, rng=rng, **options)
+
+    def setOptions(self, inPlace, branching, propagation, engine, hooks, rng,
+                   cancel=None, rated=False):
+        """
+        Stores the options described in __init__
+        """
+        self.rng = makeRng(rng)
+        self.cancel = cancel
+        self.rated = rated
+        self.engine = engine
+        self.hooks = hooks
+        self.inPlace = inPlace
+        # Only the uniqueness checks branch: the player's board keeps no
+        # candidate counts, so a move only updates the masks of its units
+        self.checkBranching = branching
+        self.propagation = propagation
+
+    def generateValuesToRemove(self, level, rng=None):
         """
         Takes a level 0,1, or 2
         Returns number of values to remove from solution
         board to create new game
         """
+        if rng is None:
+            rng = self.rng
         if level == self.EASY:
-            valuesToRemove = randint(44, 47)
+            valuesToRemove = rng.randint(44, 47)
         elif level == self.MEDIUM:
-            valuesToRemove = randint(49, 53)
+            valuesToRemove = rng.randint(49, 53)
         else:
-            valuesToRemove = randint(54, 57)
+            valuesToRemove = rng.randint(54, 57)
 
         return valuesToRemove
 
-    def generatePuzzle(self, level):
-        """For now I will generate a prototype and use backtracking on it"""
+    def generatePuzzle(self, level, rng=None):
+        """
+        Returns a puzzle for the given level with a unique solution,
+        carved out of the solution board
 
-        toRemove = self.generateValuesToRemove(level)
+        rng defaults to the game's own random.Random
+        """
+        if rng is None:
+            rng = self.rng
+        if self.rated:
+            return self.generateRatedPuzzle(level, rng)
         puzzleBoard = copy.deepcopy(self.solution)
-        return self.generatePuzzleHelper(puzzleBoard, toRemove, 0)
+        toRemove = self.generateValuesToRemove(level, rng)
+        return self.generatePuzzleHelper(puzzleBoard, toRemove, rng)
 
+    def generateRatedPuzzle(self, level, rng):
+        """
+        Returns a puzzle whose score falls in the SCORE_BANDS of the level,
+        carved out of the solution board with a new random order of the
+        positions until one reaches the low end of the band
 
-    def generatePuzzleHelper(self, board, valuesToRemove, failedTries):
+        raise: ValueError if none does within RATED_ATTEMPTS orders
         """
-        Recursively removes value and verifies unique
-        solution using backtracking
+        low, high = self.SCORE_BANDS[level]
+        for _ in range(self.RATED_ATTEMPTS):
+            puzzle = self.generatePuzzleHelper(copy.deepcopy(self.solution),
+                                               81, rng, maxScore=high)
+            if self.RATER.rate(puzzle).score >= low:
+                return puzzle
+        raise ValueError("No puzzle of level %d found in %d attempts"
+                         % (level, self.RATED_ATTEMPTS))
+
+
+    def generatePuzzleHelper(self, board, valuesToRemove, rng=None,
+                             maxScore=None):
         """
-        print(f"Vals to remove: {valuesToRemove}")
-        if failedTries >= self.MAX_TRIES:
-            return board
-        elif valuesToRemove <= 0:
-            return board
-        else:
-            newBoard = copy.deepcopy(board)
-            randomRow = randint(0, 8)
-            randomCol = randint(0, 8)
-            while newBoard[randomRow][randomCol] == 0:
-                randomRow = randint(0, 8)
-                randomCol = randint(0, 8)
-            newBoard[randomRow][randomCol] = 0
-            initialState = Sudoku(newBoard, f"Removed Num at Row {randomRow+1}, Col {randomCol+1}")
-            search = Search(initialState)
-            numSolns = search.getNumSolns()
-            if numSolns != 1:
-                return self.generatePuzzleHelper(board, valuesToRemove, failedTries+1)
+        Removes up to valuesToRemove values from board, trying each of the
+        81 positions exactly once in a random order. A value stays removed
+        only if the puzzle still has a unique solution.
+
+        With a maxScore, a value also stays removed only if the score of
+        the puzzle (see rating.py) stays below maxScore.
+
+        The same Sudoku state is updated in place and checked after every
+        removal, so its masks (and candidate counts) are never rebuilt.
+        """
+        if rng is None:
+            rng = self.rng
+        positions = list(range(81))
+        rng.shuffle(positions)
+        state = Sudoku(board)
+        removed = 0
+        for cell in positions:
+            if removed >= valuesToRemove:
+                break
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchCancelled("Puzzle generation cancelled")
+            row, col = divmod(cell, 9)
+            number = state.cells[cell]
+            if number == 0:
+                continue
+            state.updateEntry(row, col, 0)
+            numSolns, stats = self.countSolutions(state, limit=2)
+            if numSolns == 1 and maxScore is not None and \
+                    self.RATER.rate(state.cells).score >= maxScore:
+                numSolns = 0
+            if numSolns == 1:
+                removed += 1
+                if self.hooks is not None:
+                    self.hooks.onCellRemoved(row, col, stats)
             else:
-                return self.generatePuzzleHelper(newBoard, valuesToRemove-1, 0)
+                state.updateEntry(row, col, number)
+                if self.hooks is not None:
+                    self.hooks.onCellKept(row, col, stats)
+        return state.board
+
 
+    def countSolutions(self, state, limit=2):
+        """
+        Counts the solutions of a Sudoku state with the engine chosen for
+        this game, stopping once limit solutions are found. The state is
+        left unchanged.
+
+        return: a (count, stats) tuple
+        """
+        if self.engine == self.DLX:
+            return DancingLinks.countSolutions(state.board, limit, self.hooks)
+        return Search.countSolutions(state, limit=limit,
+                                     inPlace=self.inPlace,
+                                     branching=self.checkBranching,
+                                     propagation=self.propagation,
+                                     hooks=self.hooks, cancel=self.cancel)
 
     def generateSolution(self):
         """ Returns a new complete Sudoku Puzzle created through generator """
-        gen = SudokuPuzzleGen()
+        gen = SudokuPuzzleGen(self.rng)
         return gen.getBoard()
 
+    def startMoves(self):
+        """
+        Starts tracking the player's moves on the current board: the
+        numbers held by every unit (see constraints.Occupancy) and the
+        moves that can be undone and redone
+        """
+        self.occupancy = Occupancy(self.constraints)
+        self.givens = bytes(toCells(self.initPuzzle))
+        self.history = []
+        self.undone = []
+
+    @Sudoku.board.setter
+    def board(self, boardState):
+        """
+        Replaces the whole board (e.g. through resetBoard) and starts
+        tracking the moves on the new one
+        """
+        Sudoku.board.fset(self, boardState)
+        self.startMoves()
+
+    def setEntry(self, cell, number):
+        """
+        Sets an entry through the occupancy index
+
+        return: the set of (row, col) entries in conflict with it
+        """
+        self.cachedKey = None
+        return {divmod(other, 9) for other in self.occupancy.set(cell, number)}
+
+    def updateEntry(self, row, col, number):
+        """
+        Sets any entry, puzzle entries included, without recording a move;
+        the occupancy index is kept up to date
+        """
+        self.setEntry(row*9 + col, number)
+
+    def place(self, row, col, number):
+        """
+        Plays number (1 to 9, or 0 to erase) at an entry that is not part
+        of the puzzle. Unlike updateEntry, the entry may break the rules;
+        the entries that then share its number are reported.
+
+        return: the set of (row, col) entries in conflict with the entry
+        (including itself), empty if it fits
+        """
+        cell = row*9 + col
+        if self.givens[cell] != 0:
+            raise ValueError("Entry (%d, %d) is part of the puzzle" % (row, col))
+        if not 0 <= number <= 9:
+            raise ValueError("Not a Sudoku number: " + str(number))
+        self.history.append((cell, self.cells[cell], number))
+        self.undone.clear()
+        return self.setEntry(cell, number)
+
+    def erase(self, row, col):
+        """
+        Blanks an entry that is not part of the puzzle
+
+        return: an empty set (a blank entry has no conflict)
+        """
+        return self.place(row, col, 0)
+
+    def undo(self):
+        """
+        Takes back the last move played (or redone)
+
+        return: the conflicts of the entry restored, as for place, or None
+        if there is no move to undo
+        """
+        if not self.history:
+            return None
+        cell, previous, number = self.history.pop()
+        self.undone.append((cell, previous, number))
+        return self.setEntry(cell, previous)
+
+    def redo(self):
+        """
+        Plays again the last move taken back by undo
+
+        return: the conflicts of the entry, as for place, or None if there
+        is no move to redo
+        """
+        if not self.undone:
+            return None
+        cell, previous, number = self.undone.pop()
+        self.history.append((cell, previous, number))
+        return self.setEntry(cell, number)
+
+    def conflicts(self):
+        """
+        Returns the set of (row, col) entries sharing their number with
+        another entry of their row, column or 3x3 grid
+        """
+        return {divmod(cell, 9) for cell in self.occupancy.allConflicts()}
+
+    def hasConflicts(self):
+        """ Returns whether any number appears twice in a unit """
+        return self.occupancy.duplicates > 0
+
+    def rate(self):
+        """
+        Returns the difficulty Rating of the puzzle (see rating.py)
+        """
+        return self.RATER.rate(self.initPuzzle)
+
+    def hint(self):
+        """
+        Returns the next deduction on the current board as a hints.Hint (a
+        MISTAKE hint if an entry does not match the solution), or None
+        """
+        return findHint(self, self.solution)
+
+    def mistakes(self):
+        """
+        Returns the (row, col) entries that do not match the solution
+        """
+        return findMistakes(self, self.solution)
+
     def clearBoard(self):
         """
         Takes a Sudoku board and clears it by removing all the entries that
-        were previously added by the player
+        were previously added by the player, entry by entry, and forgets
+        the moves played
         """
-        self.board = copy.deepcopy(self.initPuzzle)
+        cells = self.cells
+        givens = self.givens
+        for cell in range(81):
+            if cells[cell] != givens[cell]:
+                self.occupancy.set(cell, givens[cell])
+        self.cachedKey = None
+        self.history = []
+        self.undone = []
 
 if __name__ == "__main__":
     game = Game(Game.HARD)
@@ -0,0 +1,163 @@
+"""
+Unit Tests for the Game class
+"""
+from game import *
+from hooks import Metrics
+from constraints import Constraints
+import unittest as u
+
+class GameTest(u.TestCase):
+
+    def setUp(self):
+        self.game = Game(Game.HARD, rng=5)
+
+    def tearDown(self):
+        self.game = None
+
+    def test_puzzle_is_unique(self):
+        count, stats = DancingLinks.countSolutions(self.game.initPuzzle, limit=2)
+        self.assertEqual(count, 1, "Testing generated puzzle has a unique solution")
+
+    def test_puzzle_matches_solution(self):
+        for row in range(9):
+            for col in range(9):
+                number = self.game.initPuzzle[row][col]
+                if number != 0:
+                    self.assertEqual(number, self.game.solution[row][col],\
+                    "Testing puzzle entries come from the solution")
+
+    def test_generatePuzzleHelper_removes_requested(self):
+        puzzle = self.game.generatePuzzleHelper(copy.deepcopy(self.game.solution), 10)
+        blanks = sum(row.count(0) for row in puzzle)
+        self.assertEqual(blanks, 10, "Testing the requested number of values is removed")
+
+    def test_generatePuzzleHelper_tries_every_position_once(self):
+        metrics = Metrics()
+        self.game.hooks = metrics
+        puzzle = self.game.generatePuzzleHelper(copy.deepcopy(self.game.solution), 81)
+        summary = metrics.summary()
+        blanks = sum(row.count(0) for row in puzzle)
+        self.assertTrue(blanks < 81, "Testing an unreachable target stops carving")
+        self.assertEqual(summary["cellsRemoved"], blanks, "Testing every removal is kept")
+        self.assertEqual(summary["cellsRemoved"] + summary["cellsKept"], 81,\
+        "Testing every position is tried exactly once")
+        count, stats = DancingLinks.countSolutions(puzzle, limit=2)
+        self.assertEqual(count, 1, "Testing the carved puzzle stays unique")
+
+    def test_seeded_game(self):
+        first = Game(Game.MEDIUM, rng=11)
+        second = Game(Game.MEDIUM, rng=random.Random(11))
+        self.assertEqual(first.solution, second.solution, "Testing same seed, same solution")
+        self.assertEqual(first.initPuzzle, second.initPuzzle, "Testing same seed, same puzzle")
+
+    def test_clearBoard(self):
+        self.game.updateEntry(0, 0, 0)
+        self.game.clearBoard()
+        self.assertEqual(self.game.board, self.game.initPuzzle, "Testing clearing the board")
+
+    def blankEntry(self):
+        """ Returns the first entry left blank by the puzzle """
+        cell = self.game.givens.find(0)
+        return divmod(cell, 9)
+
+    def rowClash(self):
+        """
+        Returns a (row, col, given) triple: a blank entry and the column of
+        a puzzle entry of its row whose number is not in its column or grid
+        """
+        puzzle = self.game.initPuzzle
+        for row in range(9):
+            for col in range(9):
+                if puzzle[row][col] != 0:
+                    continue
+                top, left = row - row % 3, col - col % 3
+                seen = {puzzle[r][col] for r in range(9)} | \
+                       {puzzle[r][c] for r in range(top, top + 3)
+                        for c in range(left, left + 3)}
+                for given in range(9):
+                    if puzzle[row][given] != 0 and puzzle[row][given] not in seen:
+                        return row, col, given
+        raise AssertionError("No blank entry with a clash in its row only")
+
+    def test_place_and_conflicts(self):
+        row, col, given = self.rowClash()
+        number = self.game.solution[row][col]
+        self.assertEqual(self.game.place(row, col, number), set(), "Testing a correct move fits")
+        self.assertEqual(self.game.board[row][col], number, "Testing the move is played")
+        clash = self.game.initPuzzle[row][given]
+        self.assertEqual(self.game.place(row, col, clash), {(row, col), (row, given)},\
+        "Testing the conflicting entries are reported")
+        self.assertTrue(self.game.hasConflicts(), "Testing the board has conflicts")
+        self.assertEqual(self.game.conflicts(), {(row, col), (row, given)}, "Testing all conflicts")
+        self.assertEqual(self.game.erase(row, col), set(), "Testing erasing")
+        self.assertFalse(self.game.hasConflicts(), "Testing the conflict is gone")
+        self.assertEqual(self.game.board, self.game.initPuzzle, "Testing the board is back")
+        self.assertRaises(ValueError, self.game.place, row, given, 1)
+
+    def test_masks_follow_moves(self):
+        row, col, given = self.rowClash()
+        clash = self.game.initPuzzle[row][given]
+        self.game.place(row, col, clash)
+        self.game.erase(row, col)
+        expected = Constraints(self.game.initPuzzle)
+        self.assertEqual(self.game.constraints.rows, expected.rows, "Testing row masks")
+        self.assertEqual(self.game.constraints.cols, expected.cols, "Testing col masks")
+        self.assertEqual(self.game.constraints.boxes, expected.boxes, "Testing grid masks")
+        self.assertEqual(self.game.constraints.blanks, expected.blanks, "Testing blank count")
+
+    def test_moves_keep_no_counts(self):
+        row, col, given = self.rowClash()
+        self.game.place(row, col, self.game.initPuzzle[row][given])
+        self.assertFalse(self.game.constraints.trackCounts, "Testing the board tracks no counts")
+        game = Game.fromPuzzle(self.game.initPuzzle, self.game.solution)
+        self.assertFalse(game.constraints.trackCounts, "Testing a loaded board tracks no counts")
+
+    def test_undo_redo(self):
+        row, col = self.blankEntry()
+        self.assertIsNone(self.game.undo(), "Testing nothing to undo")
+        self.game.place(row, col, 1)
+        self.game.place(row, col, 2)
+        self.game.undo()
+        self.assertEqual(self.game.board[row][col], 1, "Testing undo restores the entry")
+        self.game.undo()
+        self.assertEqual(self.game.board[row][col], 0, "Testing undo down to the puzzle")
+        self.game.redo()
+        self.assertEqual(self.game.board[row][col], 1, "Testing redo")
+        self.game.place(row, col, 3)
+        self.assertIsNone(self.game.redo(), "Testing a new move drops the redo moves")
+
+    def test_clearBoard_moves(self):
+        row, col = self.blankEntry()
+        self.game.place(row, col, 5)
+        self.game.clearBoard()
+        self.assertEqual(self.game.board, self.game.initPuzzle, "Testing clearing played moves")
+        self.assertIsNone(self.game.undo(), "Testing clearing forgets the moves")
+
+    def test_board_setter(self):
+        row, col = self.blankEntry()
+        self.game.place(row, col, 5)
+        self.game.board = self.game.initPuzzle
+        self.assertIsNone(self.game.undo(), "Testing a new board forgets the moves")
+        number = self.game.solution[row][col]
+        self.assertEqual(self.game.place(row, col, number), set(), "Testing a move on a new board")
+        self.assertEqual(self.game.board[row][col], number, "Testing the move is on the new board")
+        self.game.resetBoard()
+        self.assertEqual(self.game.place(row, col, number), set(),\
+        "Testing a move on an empty board has no conflict")
+        self.assertEqual(self.game.board[row][col], number, "Testing the move is on the empty board")
+        self.game.clearBoard()
+        self.assertEqual(self.game.board, self.game.initPuzzle, "Testing clearing an empty board")
+
+    def test_metrics_hooks(self):
+        for engine in (Game.SEARCH, Game.DLX):
+            metrics = Metrics()
+            game = Game(Game.EASY, engine=engine, hooks=metrics)
+            summary = metrics.summary()
+            blanks = sum(row.count(0) for row in game.initPuzzle)
+            self.assertEqual(summary["cellsRemoved"], blanks, "Testing every removal is reported")
+            self.assertEqual(summary["searches"], blanks + summary["cellsKept"],\
+            "Testing every uniqueness check is reported")
+
+
+if __name__ == "__main__":
+    u.main()
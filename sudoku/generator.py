@@ -33,9 +33,20 @@ to know that they might be solving the same puzzle.
 """
 
 import math
-import copy
-from random import randint, choice
+import random
 from sudoku import *
+from symmetry import *
+
+
+def makeRng(rng=None):
+    """
+    Returns a random.Random to draw from: rng itself if it already is one,
+    otherwise a new generator seeded with rng (an int seed, or None to seed
+    it from the operating system)
+    """
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
 
 class SudokuPuzzleGen():
     """ Sudoku class used to define a sudoku board for entertainement"""
@@ -76,78 +87,42 @@ class SudokuPuzzleGen():
     # static method
     def rotate90(board):
         """
-        Given an n x n board representation
+        Given a 9 x 9 board representation
         Rotates the board 90 degrees clockwise
         """
-        new_board = []
-        cols = len(board[0])
-        rows = len(board)
-        for i in range(cols):
-            row = []
-            for j in range(rows):
-                row.append(board[-1-j][i])
-            new_board.append(row)
-
-        return new_board
+        return applyToBoard(ROTATE90, board)
 
     # static method
     def rotate180(board):
         """
-        Given an n x n board representation
+        Given a 9 x 9 board representation
         Rotates the board 180 degrees clockwise
         """
-        new_board = []
-        for row in board:
-            new_row = []
-            for col in row:
-                new_row.insert(0, col)
-            new_board.insert(0, new_row)
-
-        return new_board
+        return applyToBoard(ROTATE180, board)
 
     # static method
     def rotate270(board):
         """
-        Given an n x n board representation
+        Given a 9 x 9 board representation
         Rotates the board 270 degrees clockwise
         """
-        cols = len(board[0])
-        rows = len(board)
-        new_board = [[] for k in range(rows)]
-
-        for i in range(rows):
-            for j in range(cols):
-                new_board[-1-j].append(board[i][j])
-
-        return new_board
+        return applyToBoard(ROTATE270, board)
 
     def reflect_horz(board):
         """
-        Given an n x n board representation
+        Given a 9 x 9 board representation
         Returns a new board that is the reflection of the board
         in a horizontal line about row 5 (the middle row)
         """
-        new_board = []
-        for row in board:
-            new_row = row[:]
-            new_board.insert(0, new_row)
-
-        return new_board
+        return applyToBoard(REFLECT_HORZ, board)
 
     def reflect_vert(board):
         """
-        Given an n x n board representation
+        Given a 9 x 9 board representation
         Returns a new board that is the reflection of the board
         in a vertical line about col 5 (the middle column)
         """
-        new_board = []
-        for row in board:
-            new_row = []
-            for col in row:
-                new_row.insert(0, col)
-            new_board.append(new_row)
-
-        return new_board
+        return applyToBoard(REFLECT_VERT, board)
 
     # static method
     def swap_rows(board, row1, row2):
@@ -157,9 +132,7 @@ class SudokuPuzzleGen():
         """
         assert row1//3 == row2//3, "Rows not in the same grid"
 
-        new_board = copy.deepcopy(board)
-        new_board[row1], new_board[row2] = new_board[row2], new_board[row1]
-        return new_board
+        return applyToBoard(swapRows(row1, row2), board)
 
     # static method
     def swap_cols(board, col1, col2):
@@ -169,72 +142,148 @@ class SudokuPuzzleGen():
         """
         assert col1//3 == col2//3, "Cols not in the same grid"
 
-        new_board = copy.deepcopy(board)
-        for row in new_board:
-            row[col1], row[col2] = row[col2], row[col1]
-        return new_board
+        return applyToBoard(swapCols(col1, col2), board)
 
     RANDOM_ROT = [rotate90, rotate180, rotate270, rotate0]
     RANDOM_REF = [reflect_horz, reflect_vert, rotate0]
+    # The same transformations as permutations (see symmetry.py), in the
+    # same order so a seed draws the same ones
+    RANDOM_ROT_PERMS = [ROTATE90, ROTATE180, ROTATE270, IDENTITY]
+    RANDOM_REF_PERMS = [REFLECT_HORZ, REFLECT_VERT, IDENTITY]
 
 
 
-    def __init__(self):
+    def __init__(self, rng=None, fullSymmetry=False, baseBoards=None,
+                 randomBase=False):
         """
         Creates a completely solved board
+
+        rng is a random.Random or a seed (see makeRng); every random choice
+        made by this generator is drawn from it, so the same seed always
+        gives the same board
+
+        fullSymmetry draws the board uniformly from the whole symmetry group
+        of a base board (see symmetry.py) instead of the transformations
+        described above. The base board is picked among baseBoards (9x9
+        lists of numbers, REF_BOARD by default), or built by a randomized
+        solver if randomBase is set. Giving baseBoards or randomBase
+        implies fullSymmetry.
         """
-        self.genrate_soln_board()
+        self.rng = makeRng(rng)
+        self.baseBoards = baseBoards
+        self.randomBase = randomBase
+        self.solved_board = [[0 for j in range(9)] for i in range(9)]
+        if fullSymmetry or baseBoards is not None or randomBase:
+            self.genrate_symmetric_board()
+        else:
+            self.genrate_soln_board()
 
 
     def getBoard(self):
         """ Returns a generated fully solved board """
         return self.solved_board
 
-    def genrate_soln_board(self):
+    def genrate_soln_board(self, rng=None):
         """
         Generates a random fully complete solution board based on
         above description stored in the puzzle instance
+
+        rng defaults to the generator's own random.Random
         """
-        self.place_values()
-        randRotation = choice(self.RANDOM_ROT)
-        self.solved_board = randRotation(self.solved_board)
+        if rng is None:
+            rng = self.rng
+        self.place_values(rng)
+        # Every transformation only moves entries around, so the whole
+        # chain is folded into a single permutation and applied once
+        perm = rng.choice(self.RANDOM_ROT_PERMS)
 
         for _ in range(2):
             for i in range(2, 8, 3):
-                row1 = randint(i-2,i)
-                row2 = randint(i-2,i)
-                self.solved_board = SudokuPuzzleGen.swap_rows(self.solved_board, row1, row2)
+                row1 = rng.randint(i-2,i)
+                row2 = rng.randint(i-2,i)
+                perm = compose(perm, swapRows(row1, row2))
 
         for _ in range(2):
             for i in range(2, 8, 3):
-                col1 = randint(i-2,i)
-                col2 = randint(i-2,i)
-                self.solved_board = SudokuPuzzleGen.swap_cols(self.solved_board, col1, col2)
+                col1 = rng.randint(i-2,i)
+                col2 = rng.randint(i-2,i)
+                perm = compose(perm, swapCols(col1, col2))
 
-        randReflection = choice(self.RANDOM_REF)
-        self.solved_board = randReflection(self.solved_board)
+        perm = compose(perm, rng.choice(self.RANDOM_REF_PERMS))
+        self.solved_board = applyToBoard(perm, self.solved_board)
 
 
-    def get_mapping(self):
+    def genrate_symmetric_board(self, rng=None):
+        """
+        Generates a fully complete solution board drawn uniformly from the
+        boards equivalent to a base board: relabelled, with bands, stacks,
+        rows and columns permuted and possibly transposed, all applied as a
+        single gather
+
+        rng defaults to the generator's own random.Random
+        """
+        if rng is None:
+            rng = self.rng
+        if self.randomBase:
+            base = self.random_base_board(rng)
+        elif self.baseBoards:
+            base = rng.choice(self.baseBoards)
+        else:
+            self.place_values(rng)
+            base = self.solved_board
+        cells = [num for row in base for num in row]
+        cells = randomTransform(cells, rng)
+        self.solved_board = [cells[i*9:i*9 + 9] for i in range(9)]
+
+    def random_base_board(self, rng=None):
+        """
+        Returns a complete board filled by a depth-first search from the
+        empty board that tries the candidates of every entry in a random
+        order, so any valid solution can come out of it
+        """
+        if rng is None:
+            rng = self.rng
+        state = Sudoku([[0] * 9 for i in range(9)], branching=Sudoku.MRV)
+
+        def fill():
+            if state.isDone():
+                return True
+            moves = state.moves()
+            rng.shuffle(moves)
+            for move in moves:
+                state.makeMove(move)
+                if fill():
+                    return True
+                state.unmakeMove(move)
+            return False
+
+        fill()
+        return state.board
+
+    def get_mapping(self, rng=None):
         """
         Returns a random created one-to-one map from alphabets to numbers
+
+        rng defaults to the generator's own random.Random
         """
+        if rng is None:
+            rng = self.rng
         values_to_add = self.unique_values[:]
         mapping = {}
         count = 0
         while len(values_to_add) != 0:
-            rand_val = choice(values_to_add)
+            rand_val = rng.choice(values_to_add)
             mapping[self.unique_symbols[count]] = rand_val
             values_to_add.remove(rand_val)
             count += 1
         return mapping
 
-    def place_values(self):
+    def place_values(self, rng=None):
         """
         Places numerical values on the Sudoku board to form a fully
         completed solution
         """
-        mapping = self.get_mapping()
+        mapping = self.get_mapping(rng)
         for row in range(self.ROWS):
             for col in range(self.COLUMNS):
                 num = mapping[self.REF_BOARD[row][col]]
@@ -50,6 +50,30 @@ class SudokuPuzzleGenTest(u.TestCase):
                     allNum =False
         self.assertTrue(allNum, "Verify that all the board entries are numerical values")
 
+    def test_seeded_board(self):
+        board = SudokuPuzzleGen(7).getBoard()
+        self.assertEqual(board, SudokuPuzzleGen(random.Random(7)).getBoard(),\
+        "Same seed or generator seeded alike gives the same board")
+        self.assertTrue(Sudoku(board).isDone(), "Seeded board is complete")
+
+    def test_instances_do_not_share_board(self):
+        first = SudokuPuzzleGen(1)
+        second = SudokuPuzzleGen(2)
+        self.assertIsNot(first.getBoard(), second.getBoard(), "Each generator owns its board")
+
+    def test_full_symmetry_board(self):
+        for options in ({"fullSymmetry": True}, {"randomBase": True},\
+                        {"baseBoards": [SudokuPuzzleGen(4).getBoard()]}):
+            board = SudokuPuzzleGen(5, **options).getBoard()
+            self.assertEqual(board, SudokuPuzzleGen(5, **options).getBoard(),\
+            "Same seed gives the same board")
+            state = Sudoku(board)
+            self.assertTrue(state.isDone(), "Generated board is complete")
+            self.assertTrue(all(row == 0x1FF for row in state.constraints.rows)\
+            and all(col == 0x1FF for col in state.constraints.cols)\
+            and all(box == 0x1FF for box in state.constraints.boxes),\
+            "Generated board is a solution")
+
     def test_rotate90(self):
         test_board = \
         [
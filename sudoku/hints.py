@@ -0,0 +1,256 @@
+"""
+This module finds hints for a player: the next deduction that can be made
+on the current board, with its justification, without solving the board.
+
+The techniques are tried from the cheapest to the most advanced, like the
+Propagator (see propagation.py) applies them:
+    * Naked single   (a blank entry has only one candidate left)
+    * Hidden single  (a number fits in only one entry of a unit)
+    * Pointing pair  (inside a 3x3 grid a number only fits in one row or
+                      column, so it is removed from the rest of that line)
+    * Box-line reduction (inside a row or column a number only fits in one
+                      3x3 grid, so it is removed from the rest of that grid)
+
+The candidates come from the masks the board already keeps up to date (see
+constraints.py), so no search is run. When no single is available, the
+eliminations found by the last two techniques are applied on the board,
+recorded on its trail, until a single appears; they are undone before
+returning, and the hint lists them as the steps leading to the single.
+
+Before looking for a deduction, the entries played are compared with the
+solution when one is given: a wrong entry is reported first, since every
+deduction made from it could be wrong.
+
+Rows, columns and grids are counted from 1 in the reasons, which are meant
+for the player; every other position is a 0-based (row, col) tuple.
+"""
+
+from constraints import (ALL_DIGITS, ROW_OF, COL_OF, BOX_OF, ROW_UNITS,
+                         COL_UNITS, BOX_UNITS, UNITS)
+
+MISTAKE = "mistake"
+CONTRADICTION = "contradiction"
+NAKED_SINGLE = "naked single"
+HIDDEN_SINGLE = "hidden single"
+POINTING_PAIR = "pointing pair"
+BOX_LINE = "box-line reduction"
+
+UNIT_NAMES = ("row", "column", "grid")
+
+
+def _position(cell):
+    """ Returns the (row, col) tuple of a cell """
+    return divmod(cell, 9)
+
+
+def _unitName(unit):
+    """ Returns e.g. "row 3" for an index of UNITS """
+    return "%s %d" % (UNIT_NAMES[unit // 9], unit % 9 + 1)
+
+
+def _entryName(cell):
+    """ Returns e.g. "entry (3, 7)" for a cell """
+    return "entry (%d, %d)" % (ROW_OF[cell] + 1, COL_OF[cell] + 1)
+
+
+class Hint:
+    """
+    A deduction that can be made on a board.
+
+    technique   one of the names above (MISTAKE, NAKED_SINGLE, ...)
+    reason      the justification, as a sentence for the player
+    cells       the (row, col) entries the hint is about: the entry to
+                fill, the entries losing candidates, or the wrong entries
+    placement   the (row, col, number) to play, or None
+    eliminations the (row, col, number) candidates to remove
+    pattern     the (row, col) entries that justify an elimination
+    steps       the elimination hints that must be applied first
+    """
+
+    def __init__(self, technique, reason, cells, placement=None,
+                 eliminations=(), pattern=()):
+        self.technique = technique
+        self.reason = reason
+        self.cells = list(cells)
+        self.placement = placement
+        self.eliminations = list(eliminations)
+        self.pattern = list(pattern)
+        self.steps = []
+
+    def __str__(self):
+        return self.technique + ": " + self.reason
+
+    def __repr__(self):
+        return "Hint(%r, %r)" % (self.technique, self.reason)
+
+
+def findMistakes(state, solution):
+    """
+    Returns the (row, col) entries of the board of state (a Sudoku) that are
+    filled with another number than in solution (a 9x9 list of lists)
+    """
+    cells = state.cells
+    result = []
+    for row in range(9):
+        expected = solution[row]
+        for col in range(9):
+            number = cells[row*9 + col]
+            if number != 0 and number != expected[col]:
+                result.append((row, col))
+    return result
+
+
+def findSingle(constraints):
+    """
+    Returns a CONTRADICTION hint if some entry or number has no place left,
+    otherwise the first naked single, otherwise the first hidden single, as
+    a Hint, or None
+    """
+    cells = constraints.cells
+    single = None
+    for cell in range(81):
+        if cells[cell] == 0:
+            mask = constraints.cellCandidates(cell)
+            if mask == 0:
+                return Hint(CONTRADICTION, "%s has no candidate left, so an "
+                            "earlier entry is wrong" % _entryName(cell).capitalize(),
+                            [_position(cell)])
+            if single is None and mask & (mask - 1) == 0:
+                row, col = _position(cell)
+                number = mask.bit_length()
+                single = Hint(NAKED_SINGLE, "%s can only hold %d: every other "
+                              "number is ruled out"
+                              % (_entryName(cell).capitalize(), number),
+                              [(row, col)], placement=(row, col, number))
+
+    for unit, unitCells in enumerate(UNITS):
+        placed = once = twice = 0
+        for cell in unitCells:
+            number = cells[cell]
+            if number != 0:
+                placed |= 1 << (number - 1)
+            else:
+                mask = constraints.cellCandidates(cell)
+                twice |= once & mask
+                once |= mask
+        missing = ALL_DIGITS & ~(once | placed)
+        if missing:
+            return Hint(CONTRADICTION, "%d has no place left in %s, so an "
+                        "earlier entry is wrong"
+                        % (missing.bit_length(), _unitName(unit)),
+                        [_position(cell) for cell in unitCells])
+        singles = once & ~twice & ~placed
+        if single is None and singles:
+            bit = singles & -singles
+            number = bit.bit_length()
+            for cell in unitCells:
+                if cells[cell] == 0 and constraints.cellCandidates(cell) & bit:
+                    row, col = _position(cell)
+                    single = Hint(HIDDEN_SINGLE, "%d can only go in %s within %s"
+                                  % (number, _entryName(cell), _unitName(unit)),
+                                  [(row, col)], placement=(row, col, number))
+                    break
+    return single
+
+
+def _lockedCandidates(constraints, technique, inside, across):
+    """
+    Looks for a number whose candidates inside a unit of the first family
+    all lie in a single unit of the second family, with candidates to
+    remove from the rest of that second unit
+
+    inside is a (units, index of the first one in UNITS) pair and across a
+    (units, unit of every cell, index of the first one in UNITS) triple:
+    grids and lines for pointing pairs, lines and grids for box-line
+    reductions.
+
+    return: a Hint or None
+    """
+    cells = constraints.cells
+    insideUnits, insideBase = inside
+    acrossUnits, acrossOf, acrossBase = across
+    for index, unitCells in enumerate(insideUnits):
+        candidates = {}
+        for cell in unitCells:
+            if cells[cell] == 0:
+                candidates[cell] = constraints.cellCandidates(cell)
+        for number in range(1, 10):
+            bit = 1 << (number - 1)
+            holders = [cell for cell, mask in candidates.items() if mask & bit]
+            if len(holders) < 2:
+                continue
+            target = acrossOf[holders[0]]
+            if any(acrossOf[cell] != target for cell in holders):
+                continue
+            removed = [cell for cell in acrossUnits[target]
+                       if cells[cell] == 0 and cell not in candidates
+                       and constraints.cellCandidates(cell) & bit]
+            if removed:
+                reason = "In %s, %d can only go in %s, so it can be " \
+                         "removed from the rest of that %s" \
+                         % (_unitName(insideBase + index), number,
+                            _unitName(acrossBase + target),
+                            UNIT_NAMES[acrossBase // 9])
+                return Hint(technique, reason,
+                            [_position(cell) for cell in removed],
+                            eliminations=[_position(cell) + (number,)
+                                          for cell in removed],
+                            pattern=[_position(cell) for cell in holders])
+    return None
+
+
+def findElimination(constraints):
+    """
+    Returns the first pointing pair, otherwise the first box-line
+    reduction, that removes at least one candidate, as a Hint, or None
+    """
+    boxes = (BOX_UNITS, 18)
+    for lines, lineOf, base in ((ROW_UNITS, ROW_OF, 0), (COL_UNITS, COL_OF, 9)):
+        hint = _lockedCandidates(constraints, POINTING_PAIR, boxes,
+                                 (lines, lineOf, base))
+        if hint is not None:
+            return hint
+    for lines, base in ((ROW_UNITS, 0), (COL_UNITS, 9)):
+        hint = _lockedCandidates(constraints, BOX_LINE, (lines, base),
+                                 (BOX_UNITS, BOX_OF, 18))
+        if hint is not None:
+            return hint
+    return None
+
+
+def findHint(state, solution=None):
+    """
+    Returns the next Hint for the board of state (a Sudoku), or None if no
+    technique of this module applies (or the board is complete).
+
+    With a solution (a 9x9 list of lists), wrong entries are reported first
+    as a MISTAKE hint. Otherwise the cheapest single is returned; when the
+    board needs eliminations first, they are listed in the steps of the
+    single, or the first of them is returned if no single follows. The
+    board is left unchanged.
+    """
+    if solution is not None:
+        mistakes = findMistakes(state, solution)
+        if mistakes:
+            if len(mistakes) == 1:
+                reason = "1 entry does not match the solution"
+            else:
+                reason = "%d entries do not match the solution" % len(mistakes)
+            return Hint(MISTAKE, reason, mistakes)
+    constraints = state.constraints
+    mark = len(state.trail)
+    steps = []
+    try:
+        while True:
+            hint = findSingle(constraints)
+            if hint is not None:
+                hint.steps = steps
+                return hint
+            elimination = findElimination(constraints)
+            if elimination is None:
+                return steps[0] if steps else None
+            for row, col, number in elimination.eliminations:
+                state.eliminateCandidates(row*9 + col, 1 << (number - 1))
+            steps.append(elimination)
+    finally:
+        state.undoTo(mark)
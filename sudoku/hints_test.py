@@ -0,0 +1,79 @@
+"""
+Unit Tests for the hint engine
+"""
+from hints import *
+from sudoku import Sudoku
+from game import Game
+from fixtures import BOARD, SOLUTION
+import unittest as u
+
+# No single left: two pointing pairs in grid 1 lead to a hidden single
+STUCK = \
+[
+    [8, 0, 0,   6, 3, 5,   9, 4, 2],
+    [0, 0, 5,   2, 0, 0,   6, 8, 3],
+    [3, 2, 6,   0, 8, 0,   7, 1, 5],
+
+    [0, 0, 0,   0, 0, 3,   8, 6, 0],
+    [0, 8, 3,   0, 6, 0,   1, 5, 9],
+    [6, 5, 0,   0, 0, 8,   3, 2, 0],
+
+    [1, 0, 8,   0, 0, 0,   5, 0, 6],
+    [0, 6, 0,   0, 0, 0,   2, 0, 8],
+    [5, 3, 2,   8, 9, 6,   4, 7, 1],
+]
+
+class HintTest(u.TestCase):
+
+    def test_singles_solve_board(self):
+        state = Sudoku(BOARD)
+        while not state.isDone():
+            hint = findHint(state, SOLUTION)
+            self.assertIn(hint.technique, (NAKED_SINGLE, HIDDEN_SINGLE), "Testing single found")
+            self.assertEqual(hint.steps, [], "Testing no elimination needed")
+            row, col, number = hint.placement
+            self.assertEqual(number, SOLUTION[row][col], "Testing hint matches the solution")
+            state.updateEntry(row, col, number)
+        self.assertIsNone(findHint(state), "Testing no hint on a complete board")
+
+    def test_steps(self):
+        state = Sudoku(STUCK)
+        self.assertIsNone(findSingle(state.constraints), "Testing no single on the board")
+        hint = findHint(state)
+        self.assertEqual(hint.technique, HIDDEN_SINGLE, "Testing single after eliminations")
+        self.assertEqual(hint.placement, (2, 5, 9), "Testing deduced entry")
+        self.assertEqual([step.technique for step in hint.steps], [POINTING_PAIR] * 2,\
+        "Testing eliminations leading to the single")
+        self.assertTrue(all(len(step.pattern) >= 2 for step in hint.steps), "Testing patterns")
+        self.assertEqual(state.board, STUCK, "Testing board is unchanged")
+        self.assertEqual(list(state.constraints.eliminated), [0] * 81,\
+        "Testing eliminations are undone")
+
+    def test_mistake(self):
+        board = [row[:] for row in BOARD]
+        board[0][1] = 7
+        hint = findHint(Sudoku(board), SOLUTION)
+        self.assertEqual(hint.technique, MISTAKE, "Testing wrong entry detected")
+        self.assertEqual(hint.cells, [(0, 1)], "Testing wrong entry reported")
+        self.assertEqual(findMistakes(Sudoku(BOARD), SOLUTION), [], "Testing no mistake")
+
+    def test_contradiction(self):
+        board = [row[:] for row in BOARD]
+        board[0][1] = 8
+        board[0][4] = 4
+        hint = findHint(Sudoku(board))
+        self.assertEqual(hint.technique, CONTRADICTION, "Testing dead end detected")
+
+    def test_game_hint(self):
+        game = Game(Game.EASY, rng=1)
+        hint = game.hint()
+        row, col, number = hint.placement
+        self.assertEqual(number, game.solution[row][col], "Testing game hint")
+        wrong = number % 9 + 1
+        game.place(row, col, wrong)
+        self.assertEqual(game.mistakes(), [(row, col)], "Testing game mistakes")
+        self.assertEqual(game.hint().technique, MISTAKE, "Testing mistake hint first")
+
+
+if __name__ == "__main__":
+    u.main()
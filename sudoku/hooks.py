@@ -0,0 +1,102 @@
+"""
+This module contains the hooks that can be attached to Search and Game to
+follow a search or a puzzle generation without printing anything.
+
+Hooks is a base class whose callbacks do nothing; subclasses override the
+ones they need. Search and Game only call hooks when some are attached, so
+leaving them out costs nothing.
+
+Metrics is a ready-made subclass that counts what happened, e.g.
+
+    metrics = Metrics()
+    game = Game(Game.HARD, hooks=metrics)
+    print(metrics.summary())
+"""
+
+
+class Hooks:
+    """
+    Callbacks invoked by Search (the first four) and Game (the last two)
+    """
+
+    def onNodeExpanded(self, state, frontierSize):
+        """ Called after a state is expanded, with the new frontier size """
+        pass
+
+    def onBacktrack(self, state):
+        """ Called when the search leaves a dead end """
+        pass
+
+    def onSolution(self, state):
+        """ Called for every solution found """
+        pass
+
+    def onSearchDone(self, stats):
+        """ Called once a search is over with its getStats dictionary """
+        pass
+
+    def onCellRemoved(self, row, col, stats):
+        """
+        Called when Game removes the value at row, col from the puzzle,
+        with the stats of the uniqueness check that allowed it
+        """
+        pass
+
+    def onCellKept(self, row, col, stats):
+        """
+        Called when Game puts a value back because removing it made the
+        solution ambiguous, with the stats of the uniqueness check
+        """
+        pass
+
+
+class Metrics(Hooks):
+    """
+    Hooks that count nodes, backtracks, solutions and removals, and record
+    the wall time of every search (i.e. every uniqueness check of a Game)
+    """
+
+    def __init__(self):
+        self.nodesExpanded = 0
+        self.backtracks = 0
+        self.solutions = 0
+        self.maxFrontier = 0
+        self.searches = 0
+        self.searchTimes = []
+        self.cellsRemoved = 0
+        self.cellsKept = 0
+
+    def onNodeExpanded(self, state, frontierSize):
+        self.nodesExpanded += 1
+        if frontierSize > self.maxFrontier:
+            self.maxFrontier = frontierSize
+
+    def onBacktrack(self, state):
+        self.backtracks += 1
+
+    def onSolution(self, state):
+        self.solutions += 1
+
+    def onSearchDone(self, stats):
+        self.searches += 1
+        self.searchTimes.append(stats["wallTime"])
+
+    def onCellRemoved(self, row, col, stats):
+        self.cellsRemoved += 1
+
+    def onCellKept(self, row, col, stats):
+        self.cellsKept += 1
+
+    def summary(self):
+        """ Returns the counters as a dictionary """
+        return {
+            "nodesExpanded": self.nodesExpanded,
+            "backtracks": self.backtracks,
+            "solutions": self.solutions,
+            "maxFrontier": self.maxFrontier,
+            "searches": self.searches,
+            "searchTime": sum(self.searchTimes),
+            "maxSearchTime": max(self.searchTimes, default=0.0),
+            "cellsRemoved": self.cellsRemoved,
+            "cellsKept": self.cellsKept,
+        }
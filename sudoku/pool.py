@@ -0,0 +1,136 @@
+"""
+This module keeps puzzles ready in advance so that starting a Game does not
+wait for a puzzle to be carved.
+
+GamePool holds up to size generated puzzles for every level. Workers
+(threads, or processes with processes=True) generate new ones in the
+background whenever the puzzles ready or being generated for a level fall
+below the watermark. acquire takes a ready puzzle if there is one (a hit);
+otherwise it waits up to timeout for a worker to finish one, and then
+generates the puzzle itself (a miss):
+
+    with GamePool(size=8) as pool:
+        game = pool.acquire(Game.HARD, timeout=0.05)
+        print(pool.getStats())
+"""
+
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from game import Game
+from batch import generateOne
+
+
+class GamePool:
+    """
+    Prefetching pool of generated puzzles, refilled by background workers
+    """
+
+    def __init__(self, size=4, watermark=None, workers=None, processes=False,
+                 levels=(Game.EASY, Game.MEDIUM, Game.HARD), seed=None,
+                 **options):
+        """
+        Starts filling the pool with size puzzles of every level.
+
+        watermark is the number of puzzles (ready or being generated) of a
+        level below which the pool refills it up to size (half of size by
+        default). workers is the number of threads or processes, seed makes
+        the puzzles reproducible and any other option is passed to Game.
+        """
+        self.size = size
+        self.watermark = size // 2 if watermark is None else watermark
+        self.options = options
+        self.seeds = random.Random(seed)
+        self.ready = {level: deque() for level in levels}
+        self.generating = {level: 0 for level in levels}
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        if processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        with self.condition:
+            for level in levels:
+                self.refill(level)
+
+    def refill(self, level):
+        """
+        Submits enough generations to bring a level back to size puzzles
+        (the caller holds the condition)
+        """
+        while not self.closed and \
+                len(self.ready[level]) + self.generating[level] < self.size:
+            future = self.executor.submit(generateOne, level,
+                                          self.seeds.getrandbits(64),
+                                          self.options)
+            self.generating[level] += 1
+            future.add_done_callback(
+                lambda future, level=level: self.finished(level, future))
+
+    def finished(self, level, future):
+        """
+        Stores a puzzle generated by a worker and wakes up the waiters
+        """
+        with self.condition:
+            self.generating[level] -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.failures += 1
+            else:
+                self.ready[level].append(future.result())
+                self.condition.notify_all()
+
+    def acquire(self, level, timeout=0.0):
+        """
+        Returns a new Game of the given level, on a ready puzzle if one is
+        available within timeout seconds, or on a puzzle generated right
+        away otherwise
+        """
+        with self.condition:
+            ready = self.ready[level]
+            if not ready and timeout:
+                self.condition.wait_for(lambda: ready, timeout)
+            if ready:
+                self.hits += 1
+                record = ready.popleft()
+            else:
+                self.misses += 1
+                record = None
+                seed = self.seeds.getrandbits(64)
+            if len(ready) + self.generating[level] < self.watermark:
+                self.refill(level)
+        if record is None:
+            record = generateOne(level, seed, self.options)
+        puzzle, solution, stats = record
+        return Game.fromPuzzle(puzzle, solution, **self.options)
+
+    def getStats(self):
+        """
+        Returns a dictionary with the hit, miss and failure counters and
+        the number of puzzles ready for every level
+        """
+        with self.condition:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+                "ready": {level: len(ready)
+                          for level, ready in self.ready.items()},
+            }
+
+    def close(self):
+        """ Stops the workers, dropping the generations not started yet """
+        with self.condition:
+            self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
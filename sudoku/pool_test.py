@@ -0,0 +1,39 @@
+"""
+Unit Tests for the prefetching GamePool
+"""
+from pool import *
+from dlx import DancingLinks
+import unittest as u
+
+class GamePoolTest(u.TestCase):
+
+    def test_acquire_hit(self):
+        with GamePool(size=2, workers=2, levels=(Game.EASY,), seed=1) as pool:
+            game = pool.acquire(Game.EASY, timeout=30)
+            stats = pool.getStats()
+        self.assertEqual(stats["hits"], 1, "Testing a ready puzzle is a hit")
+        self.assertEqual(stats["misses"], 0, "Testing no miss")
+        count, dlxStats = DancingLinks.countSolutions(game.initPuzzle, limit=2)
+        self.assertEqual(count, 1, "Testing pooled puzzle has a unique solution")
+        self.assertEqual(game.board, game.initPuzzle, "Testing game starts on the puzzle")
+
+    def test_acquire_miss(self):
+        with GamePool(size=0, levels=(Game.EASY,), seed=1) as pool:
+            game = pool.acquire(Game.EASY)
+            stats = pool.getStats()
+        self.assertEqual(stats["misses"], 1, "Testing an empty pool is a miss")
+        self.assertEqual(len(game.solution), 9, "Testing the fallback generates a game")
+
+    def test_refill(self):
+        with GamePool(size=3, watermark=3, workers=1, levels=(Game.EASY,), seed=1) as pool:
+            for _ in range(4):
+                pool.acquire(Game.EASY, timeout=30)
+            with pool.condition:
+                pool.condition.wait_for(lambda: len(pool.ready[Game.EASY]) == 3, 30)
+            stats = pool.getStats()
+        self.assertEqual(stats["hits"], 4, "Testing refilled puzzles are hits")
+        self.assertEqual(stats["ready"][Game.EASY], 3, "Testing the pool is refilled to size")
+
+
+if __name__ == "__main__":
+    u.main()
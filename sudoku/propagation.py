@@ -0,0 +1,176 @@
+"""
+This module contains the Propagator class, a constraint propagation stage
+that deduces forced entries of a Sudoku board before the search branches.
+
+The deductions applied are the ones a person would use first:
+    * Naked single   (a blank entry has only one candidate left)
+    * Hidden single  (a number fits in only one entry of a row, column
+                      or 3x3 grid)
+and optionally:
+    * Pointing pair  (inside a 3x3 grid, a number only fits in one row or
+                      column, so it can be removed from the rest of that
+                      row or column)
+    * Box-line reduction (inside a row or column, a number only fits in one
+                      3x3 grid, so it can be removed from the rest of that
+                      grid)
+
+The propagator works on any state offering the same interface as Sudoku:
+a `constraints` attribute (see constraints.py) and the placeEntry and
+eliminateCandidates methods, which record every change so that it can be
+undone when the search backtracks.
+"""
+
+from constraints import (ALL_DIGITS, ROW_OF, COL_OF, BOX_OF, ROW_UNITS,
+                         COL_UNITS, BOX_UNITS, UNITS)
+
+
+class Propagator:
+    """
+    Applies deductions to a state until none of them changes anything.
+    """
+
+    def __init__(self, pointingPairs=False, boxLine=False):
+        """
+        Singles are always applied. pointingPairs and boxLine enable the
+        two candidate elimination techniques.
+        """
+        self.pointingPairs = pointingPairs
+        self.boxLine = boxLine
+
+    def propagate(self, state):
+        """
+        Applies the deductions to state in place until nothing changes.
+
+        return: False iff a contradiction was found (a blank entry with no
+        candidate, or a number with no place left in a unit)
+        """
+        while True:
+            changed = self.applyNakedSingles(state)
+            if changed is None:
+                return False
+            if changed:
+                continue
+            changed = self.applyHiddenSingles(state)
+            if changed is None:
+                return False
+            if changed:
+                continue
+            if self.pointingPairs and self.applyPointingPairs(state):
+                continue
+            if self.boxLine and self.applyBoxLine(state):
+                continue
+            return True
+
+    def applyNakedSingles(self, state):
+        """
+        Fills every blank entry that has a single candidate.
+
+        return: the number of entries filled, or None on a contradiction
+        """
+        constraints = state.constraints
+        cells = constraints.cells
+        changed = 0
+        for cell in range(81):
+            if cells[cell] == 0:
+                mask = constraints.cellCandidates(cell)
+                if mask == 0:
+                    return None
+                if mask & (mask - 1) == 0:
+                    state.placeEntry(ROW_OF[cell], COL_OF[cell], mask.bit_length())
+                    changed += 1
+        return changed
+
+    def applyHiddenSingles(self, state):
+        """
+        Fills every entry that is the only place for a number in a unit.
+
+        return: the number of entries filled, or None on a contradiction
+        """
+        constraints = state.constraints
+        cells = constraints.cells
+        changed = 0
+        for unit in UNITS:
+            placed = once = twice = 0
+            for cell in unit:
+                number = cells[cell]
+                if number != 0:
+                    placed |= 1 << (number - 1)
+                else:
+                    mask = constraints.cellCandidates(cell)
+                    twice |= once & mask
+                    once |= mask
+            if (once | placed) != ALL_DIGITS:
+                return None
+            singles = once & ~twice & ~placed
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for cell in unit:
+                    if cells[cell] == 0 and constraints.cellCandidates(cell) & bit:
+                        state.placeEntry(ROW_OF[cell], COL_OF[cell], bit.bit_length())
+                        changed += 1
+                        break
+                else:
+                    # An earlier single of this unit took the only place left
+                    return None
+        return changed
+
+    def applyPointingPairs(self, state):
+        """
+        Inside every 3x3 grid, a number whose candidates all lie in one row
+        (or column) is removed from the rest of that row (or column).
+
+        return: whether any candidate was removed
+        """
+        constraints = state.constraints
+        cells = constraints.cells
+        changed = False
+        for box in range(9):
+            candidateRows = [0] * 9
+            candidateCols = [0] * 9
+            for cell in BOX_UNITS[box]:
+                if cells[cell] == 0:
+                    mask = constraints.cellCandidates(cell)
+                    candidateRows[ROW_OF[cell]] |= mask
+                    candidateCols[COL_OF[cell]] |= mask
+            for lines, units in ((candidateRows, ROW_UNITS), (candidateCols, COL_UNITS)):
+                for line in range(9):
+                    # numbers only found on this line of the grid
+                    only = lines[line]
+                    for other in range(9):
+                        if other != line:
+                            only &= ~lines[other]
+                    if only:
+                        for cell in units[line]:
+                            if BOX_OF[cell] != box and cells[cell] == 0:
+                                if state.eliminateCandidates(cell, only):
+                                    changed = True
+        return changed
+
+    def applyBoxLine(self, state):
+        """
+        Inside every row and column, a number whose candidates all lie in
+        one 3x3 grid is removed from the rest of that grid.
+
+        return: whether any candidate was removed
+        """
+        constraints = state.constraints
+        cells = constraints.cells
+        changed = False
+        for units, lineOf in ((ROW_UNITS, ROW_OF), (COL_UNITS, COL_OF)):
+            for line in range(9):
+                candidateBoxes = [0] * 9
+                for cell in units[line]:
+                    if cells[cell] == 0:
+                        candidateBoxes[BOX_OF[cell]] |= constraints.cellCandidates(cell)
+                for box in range(9):
+                    only = candidateBoxes[box]
+                    for other in range(9):
+                        if other != box:
+                            only &= ~candidateBoxes[other]
+                    if only:
+                        for cell in BOX_UNITS[box]:
+                            if lineOf[cell] != line and cells[cell] == 0:
+                                if state.eliminateCandidates(cell, only):
+                                    changed = True
+        return changed
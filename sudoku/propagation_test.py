@@ -0,0 +1,68 @@
+"""
+Unit Tests for the Propagator class
+"""
+from propagation import *
+from constraints import digitBit
+from sudoku import *
+import unittest as u
+
+class PropagatorTest(u.TestCase):
+
+    def setUp(self):
+        board = [[0 for j in range(9)] for i in range(9)]
+        self.test_game = Sudoku(board)
+
+    def test_naked_single(self):
+        for i in range(8):
+            self.test_game.updateEntry(4,i,i+1)
+        self.assertEqual(Propagator().applyNakedSingles(self.test_game), 1,\
+        "Testing a single naked single is filled")
+        self.assertEqual(self.test_game.board[4][8], 9, "Testing naked single value")
+
+    def test_hidden_single(self):
+        # 9 is blocked from every entry of the first grid except (0,0)
+        self.test_game.updateEntry(1,4,9)
+        self.test_game.updateEntry(2,7,9)
+        self.test_game.updateEntry(5,1,9)
+        self.test_game.updateEntry(8,2,9)
+        Propagator().applyHiddenSingles(self.test_game)
+        self.assertEqual(self.test_game.board[0][0], 9, "Testing hidden single value")
+
+    def test_contradiction(self):
+        for i in range(8):
+            self.test_game.updateEntry(4,i,i+1)
+        self.test_game.updateEntry(0,8,9)
+        self.assertFalse(Propagator().propagate(self.test_game),\
+        "Testing an entry without candidates is a contradiction")
+
+    def test_pointing_pair(self):
+        # 1 only fits in the first row of the first grid
+        self.test_game.updateEntry(1,5,1)
+        self.test_game.updateEntry(2,7,1)
+        Propagator().applyPointingPairs(self.test_game)
+        self.assertFalse(self.test_game.constraints.candidates(0,8) & digitBit(1),\
+        "Testing pointing pair removes the number from the rest of the row")
+        self.assertTrue(self.test_game.constraints.candidates(0,0) & digitBit(1),\
+        "Testing pointing pair keeps the number inside the grid")
+
+    def test_box_line(self):
+        # 1 only fits in the first grid of the first row
+        for i in range(3,9):
+            self.test_game.updateEntry(0,i,i-1)
+        Propagator().applyBoxLine(self.test_game)
+        self.assertFalse(self.test_game.constraints.candidates(1,0) & digitBit(1),\
+        "Testing box-line removes the number from the rest of the grid")
+
+    def test_undo(self):
+        for i in range(8):
+            self.test_game.updateEntry(4,i,i+1)
+        self.test_game.setPropagation(Propagator(True, True))
+        self.test_game.makeMove((0,0,1))
+        self.test_game.unmakeMove((0,0,1))
+        self.assertEqual(self.test_game.board[4][8], 0, "Testing propagation is undone")
+        self.assertEqual(list(self.test_game.constraints.eliminated), [0]*81,\
+        "Testing eliminations are undone")
+
+
+if __name__ == "__main__":
+    u.main()
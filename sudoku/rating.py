@@ -0,0 +1,125 @@
+"""
+This module rates the difficulty of a puzzle by the techniques a person
+needs to solve it, rather than by its number of blanks.
+
+The puzzle is solved the way a person would, with the cheapest technique
+that still makes progress (see propagation.py): naked singles, hidden
+singles, pointing pairs and box-line reductions. A puzzle those techniques
+cannot finish needs a guess. The score is set by the hardest technique
+needed: each technique of TECHNIQUES starts a tier of TIER_SIZE points.
+Inside a tier, the uses of every technique, weighted by WEIGHTS, only break
+ties, so more blanks never make a puzzle harder than one more technique.
+
+Carving a puzzle rates boards that differ by one entry, and their solves
+quickly reach the same boards. The Rater therefore remembers, for every
+board (and candidate eliminations) met between two steps, the techniques
+still needed from there, and stops a solve as soon as it reaches one of
+those boards.
+"""
+
+from propagation import Propagator
+from sudoku import Sudoku
+from hints import NAKED_SINGLE, HIDDEN_SINGLE, POINTING_PAIR, BOX_LINE
+
+GUESS = "guess"
+
+TECHNIQUES = (NAKED_SINGLE, HIDDEN_SINGLE, POINTING_PAIR, BOX_LINE, GUESS)
+WEIGHTS = (1, 2, 10, 12, 60)
+TIER_SIZE = 100
+
+
+class Rating:
+    """
+    The techniques used to solve a puzzle (a dictionary from technique
+    name to number of uses), the tier of the hardest one (the index of it
+    in TECHNIQUES, 0 if nothing was needed) and the resulting score
+    """
+
+    def __init__(self, uses):
+        """ Takes the number of uses of every technique of TECHNIQUES """
+        self.counts = dict(zip(TECHNIQUES, uses))
+        self.tier = max((index for index, count in enumerate(uses) if count),
+                        default=0)
+        weighted = sum(weight * count for weight, count in zip(WEIGHTS, uses))
+        self.score = self.tier * TIER_SIZE + min(weighted, TIER_SIZE - 1)
+
+    def needsGuess(self):
+        """ Returns whether the techniques of this module are not enough """
+        return self.counts[GUESS] > 0
+
+    def hardest(self):
+        """ Returns the most advanced technique used, or None """
+        for technique in reversed(TECHNIQUES):
+            if self.counts[technique]:
+                return technique
+        return None
+
+    def __str__(self):
+        return "score %d (%s)" % (self.score, ", ".join(
+            "%s x%d" % (technique, count)
+            for technique, count in self.counts.items() if count))
+
+
+class Rater:
+    """
+    Rates puzzles, remembering the remaining work from up to cacheSize
+    intermediate boards
+    """
+
+    PROPAGATOR = Propagator()
+
+    def __init__(self, cacheSize=100000):
+        self.cacheSize = cacheSize
+        self.cache = {}
+        self.hits = 0
+
+    def rate(self, board):
+        """
+        Takes a puzzle (a 9x9 list of lists or a flat bytearray, which is
+        copied) with a unique solution and returns its Rating
+
+        raise: ValueError if the techniques find the board has no solution
+        """
+        if isinstance(board, bytearray):
+            board = board[:]
+        state = Sudoku(board)
+        propagator = self.PROPAGATOR
+        uses = [0] * len(TECHNIQUES)
+        visited = []
+        while True:
+            key = bytes(state.cells) + state.constraints.eliminated.tobytes()
+            remaining = self.cache.get(key)
+            if remaining is not None:
+                self.hits += 1
+                uses = [used + left for used, left in zip(uses, remaining)]
+                break
+            visited.append((key, uses[:]))
+
+            count = propagator.applyNakedSingles(state)
+            if count is None:
+                raise ValueError("The board has no solution")
+            if count:
+                uses[0] += count
+                continue
+            count = propagator.applyHiddenSingles(state)
+            if count is None:
+                raise ValueError("The board has no solution")
+            if count:
+                uses[1] += count
+                continue
+            if propagator.applyPointingPairs(state):
+                uses[2] += 1
+                continue
+            if propagator.applyBoxLine(state):
+                uses[3] += 1
+                continue
+            if not state.isDone():
+                uses[4] += 1
+            break
+
+        if len(self.cache) + len(visited) > self.cacheSize:
+            self.cache.clear()
+        for key, before in visited:
+            self.cache[key] = tuple(used - earlier
+                                    for used, earlier in zip(uses, before))
+        return Rating(uses)
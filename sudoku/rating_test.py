@@ -0,0 +1,89 @@
+"""
+Unit Tests for the difficulty rater
+"""
+from rating import *
+from hints import NAKED_SINGLE, HIDDEN_SINGLE, POINTING_PAIR, BOX_LINE
+from sudoku import toCells
+from game import Game
+from fixtures import BOARD
+import unittest as u
+
+class RatingTest(u.TestCase):
+
+    def test_singles(self):
+        rating = Rater().rate(BOARD)
+        blanks = sum(row.count(0) for row in BOARD)
+        self.assertEqual(rating.counts[NAKED_SINGLE] + rating.counts[HIDDEN_SINGLE],
+                         blanks, "Testing every blank is filled by a single")
+        self.assertFalse(rating.needsGuess(), "Testing singles are enough")
+        self.assertIn(rating.hardest(), (NAKED_SINGLE, HIDDEN_SINGLE),
+                      "Testing only singles are used")
+        self.assertEqual(rating.tier, TECHNIQUES.index(rating.hardest()),
+                         "Testing the tier is the hardest technique")
+        self.assertEqual(rating.score // TIER_SIZE, rating.tier, "Testing the score is in the tier")
+
+    def test_tiers(self):
+        easy = Rating([60, 0, 0, 0, 0])
+        harder = Rating([1, 1, 0, 0, 0])
+        self.assertLess(easy.score, harder.score,
+                        "Testing one harder technique outweighs many easier uses")
+        self.assertLess(harder.score, Rating([1, 2, 0, 0, 0]).score,
+                        "Testing more uses break ties inside a tier")
+        self.assertEqual(Rating([0] * len(TECHNIQUES)).score, 0, "Testing a complete board")
+        self.assertEqual(Rating([0, 0, 0, 0, 9]).score, 5 * TIER_SIZE - 1,
+                         "Testing the uses stay inside the tier")
+
+    def test_empty_board_needs_guess(self):
+        rating = Rater().rate([[0] * 9 for _ in range(9)])
+        self.assertTrue(rating.needsGuess(), "Testing an empty board needs a guess")
+        self.assertEqual(rating.hardest(), GUESS, "Testing guess is the hardest technique")
+
+    def test_cache(self):
+        rater = Rater()
+        first = rater.rate(BOARD)
+        self.assertEqual(rater.hits, 0, "Testing a new rater misses its cache")
+        cells = toCells(BOARD)
+        second = rater.rate(cells)
+        self.assertEqual(rater.hits, 1, "Testing the same board hits the cache")
+        self.assertEqual(second.counts, first.counts,
+                         "Testing a cached rating matches the computed one")
+        self.assertEqual(cells, toCells(BOARD), "Testing the cells are copied")
+
+        # One more entry filled: the solve reaches a cached board
+        board = [row[:] for row in BOARD]
+        board[0][1] = 4
+        rater.rate(board)
+        self.assertEqual(rater.hits, 2, "Testing a later board hits the cache")
+
+    def test_cache_size(self):
+        rater = Rater(cacheSize=5)
+        rater.rate(BOARD)
+        self.assertLessEqual(len(rater.cache), 5 + 81, "Testing the cache is cleared when full")
+        rater.rate([[0] * 9 for _ in range(9)])
+        self.assertLessEqual(len(rater.cache), 5 + 81, "Testing the cache is cleared when full")
+
+    def test_contradiction(self):
+        board = [row[:] for row in BOARD]
+        board[0][1] = 1
+        with self.assertRaises(ValueError, msg="Testing a broken board cannot be rated"):
+            Rater().rate(board)
+
+    def test_rated_game(self):
+        hardest = {Game.EASY: (NAKED_SINGLE,), Game.MEDIUM: (HIDDEN_SINGLE,),
+                   Game.HARD: (POINTING_PAIR, BOX_LINE, GUESS)}
+        for level in (Game.EASY, Game.MEDIUM, Game.HARD):
+            low, high = Game.SCORE_BANDS[level]
+            for seed in range(3):
+                game = Game(level, rng=seed, rated=True)
+                rating = game.rate()
+                self.assertGreaterEqual(rating.score, low, "Testing the puzzle is not too easy")
+                if high is not None:
+                    self.assertLess(rating.score, high, "Testing the puzzle is not too hard")
+                self.assertIn(rating.hardest(), hardest[level],
+                              "Testing the hardest technique matches the level")
+                self.assertEqual(Game(level, rng=seed, rated=True).initPuzzle,
+                                 game.initPuzzle, "Testing a seeded rated game is reproducible")
+
+
+if __name__ == "__main__":
+    u.main()
@@ -6,6 +6,19 @@ The Search algorithm creates Node instances of the Sudoku Board and searches
 the tree for a solution.
 
 """
+import copy
+import time
+
+# Number of loop iterations between two checks of the cancel flag
+CANCEL_INTERVAL = 256
+
+
+class SearchCancelled(Exception):
+    """
+    Raised when a search (or a Game generation) is stopped by its cancel
+    flag before it is over
+    """
+    pass
 
 class Queue:
     """
@@ -70,6 +83,8 @@ class Node:
     node contains a state, a parent node, and the depth of the node in
     the search tree.  The root node should be at depth 0.
     """
+    __slots__ = ("state", "parent", "depth")
+
     def __init__(self, state, parent, depth):
         self.state = state
         self.parent = parent
@@ -89,17 +104,112 @@ class Search:
     number of possible solutions by using backtracking search.
     The problem domain should be based on the ProblemState
     class.
+
+    With inPlace set to True the search does not create a new state per
+    successor. It applies each move to the initial state itself and undoes
+    it when backtracking, which requires the state to implement moves,
+    makeMove and unmakeMove. The initial state is left unchanged once the
+    search is over.
+
+    With a limit the search stops as soon as that many solutions have been
+    found, which is all a uniqueness check needs (see countSolutions).
+
+    A branching strategy, when given, is passed to the initial state through
+    setBranching before the search starts. Likewise a propagation stage is
+    passed through setPropagation; the initial state is then propagated
+    before the search (and restored afterwards) and every state propagates
+    itself after each move, so branches leading to a contradiction are
+    pruned right away.
+
+    With recordPath set to False the stack holds bare states instead of
+    Node instances, so no parent links (which keep every ancestor alive)
+    or depths are stored. That is enough to count solutions, but showPath
+    and buildPath are then unavailable.
+
+    hooks is an optional object with the callbacks described in hooks.py
+    (onNodeExpanded, onBacktrack, onSolution, onSearchDone). Nothing is
+    printed or called per node unless verbose is set or hooks are given.
+
+    cancel is an optional flag (e.g. a threading.Event) checked every
+    CANCEL_INTERVAL iterations; once it is set the search stops, restores
+    the initial state and raises SearchCancelled.
     """
     total_solns = 0
 
-    def __init__(self, initialState, verbose=False):
-        self.uniqueStates = {}
-        self.uniqueStates[initialState.dictkey()] = True
-        self.q = Stack()
-        self.q.push(Node(initialState, None, 0))
-
+    def __init__(self, initialState, verbose=False, inPlace=False, limit=None,
+                 branching=None, propagation=None, recordPath=True, hooks=None,
+                 cancel=None):
+        if branching is not None:
+            initialState.setBranching(branching)
         self.verbose = verbose
-        solution = self.execute()
+        self.inPlace = inPlace
+        self.limit = limit
+        self.recordPath = recordPath
+        self.hooks = hooks
+        self.cancel = cancel
+        self.cancelled = False
+        self.nodesExpanded = 0
+        self.backtracks = 0
+        self.maxFrontier = 0
+        self.firstSolution = None
+        self.firstGoal = None
+        self.wallTime = None
+        start = time.perf_counter()
+        self.run(initialState, propagation)
+        self.wallTime = time.perf_counter() - start
+        if self.cancelled:
+            raise SearchCancelled("Search cancelled after %d nodes"
+                                  % self.nodesExpanded)
+        if hooks is not None:
+            hooks.onSearchDone(self.getStats())
+
+    def run(self, initialState, propagation):
+        """
+        Propagates the initial state if needed and runs the search
+        """
+        if propagation is not None:
+            initialState.setPropagation(propagation)
+            if not initialState.propagate():
+                initialState.unpropagate()
+                return
+        if self.inPlace:
+            self.initialState = initialState
+            solution = self.executeInPlace()
+        else:
+            # Duplicates cannot occur when the search space is a tree, so
+            # the table of generated states is only kept for graphs
+            self.uniqueStates = None
+            if not initialState.isTree():
+                self.uniqueStates = set()
+                self.uniqueStates.add(initialState.key())
+            self.q = Stack()
+            if self.recordPath:
+                self.q.push(Node(initialState, None, 0))
+            else:
+                self.q.push(initialState)
+            solution = self.execute()
+        if propagation is not None:
+            # Propagation alone may have solved the root, which is about to
+            # be restored, so the solution keeps its own copy
+            if self.firstSolution is initialState:
+                self.firstSolution = copy.deepcopy(initialState)
+                if self.firstGoal is not None:
+                    self.firstGoal = Node(self.firstSolution, None, 0)
+            initialState.unpropagate()
+
+    @staticmethod
+    def countSolutions(initialState, limit=2, **options):
+        """
+        Counts the solutions of initialState, stopping once limit solutions
+        are found. Any other Search option (e.g. inPlace) can be passed;
+        paths are not recorded unless recordPath=True is given.
+
+        return: a (count, stats) tuple where count is at most limit and
+        stats is the dictionary returned by getStats
+        """
+        options.setdefault("recordPath", False)
+        search = Search(initialState, limit=limit, **options)
+        return search.getNumSolns(), search.getStats()
 
     def getNumSolns(self):
         """
@@ -107,27 +217,171 @@ class Search:
         """
         return self.total_solns
 
+    def getFirstSolution(self):
+        """
+        Returns the first solution state found, or None
+        """
+        return self.firstSolution
+
+    def getStats(self):
+        """
+        Returns a dictionary with statistics about the search
+        """
+        return {
+            "solutions": self.total_solns,
+            "nodesExpanded": self.nodesExpanded,
+            "backtracks": self.backtracks,
+            "maxFrontier": self.maxFrontier,
+            "wallTime": self.wallTime,
+            "limitReached": self.limitReached(),
+        }
+
+    def limitReached(self):
+        """
+        Returns whether the search stopped because of its solution limit
+        """
+        return self.limit is not None and self.total_solns >= self.limit
+
+    def isCancelled(self):
+        """
+        Returns whether the cancel flag is set, remembering it
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            self.cancelled = True
+        return self.cancelled
 
     def execute(self):
+        hooks = self.hooks
+        countdown = CANCEL_INTERVAL
         while not self.q.empty():
+            countdown -= 1
+            if countdown == 0:
+                countdown = CANCEL_INTERVAL
+                if self.isCancelled():
+                    return
             current = self.q.pop()
-            if current.state.isDone():
+            if self.recordPath:
+                state = current.state
+            else:
+                state = current
+            if state.isDone():
                 self.total_solns += 1
+                if self.firstSolution is None:
+                    self.firstSolution = state
+                    if self.recordPath:
+                        self.firstGoal = current
+                if hooks is not None:
+                    hooks.onSolution(state)
+                if self.limitReached():
+                    return
             else:
-                successors = current.state.followingStates()
+                self.nodesExpanded += 1
+                successors = state.followingStates()
                 for nextState in successors:
-                    if nextState.dictkey() not in self.uniqueStates.keys():
-                        n = Node(nextState, current, current.depth+1)
-                        self.q.push(n)
-                        self.uniqueStates[nextState.dictkey()] = True
+                    if self.uniqueStates is not None:
+                        key = nextState.key()
+                        if key in self.uniqueStates:
+                            continue
+                        self.uniqueStates.add(key)
+                    if self.recordPath:
+                        self.q.push(Node(nextState, current, current.depth+1))
+                    else:
+                        self.q.push(nextState)
+                frontier = self.q.size()
+                if frontier > self.maxFrontier:
+                    self.maxFrontier = frontier
+                if not successors:
+                    self.backtracks += 1
+                if hooks is not None:
+                    hooks.onNodeExpanded(state, frontier)
+                    if not successors:
+                        hooks.onBacktrack(state)
                 if self.verbose:
                     print("Expanded:", current)
                     print("Number of successors:", len(successors))
                     print("Queue length:", self.q.size())
                     print( "-------------------------------")
 
+    def executeInPlace(self):
+        """
+        Backtracking search that makes and unmakes moves on a single state.
+        The stack holds, for every level of the search, the move that led
+        to it and an iterator over the moves left to try from it.
+        """
+        hooks = self.hooks
+        state = self.initialState
+        if state.isDone():
+            self.total_solns += 1
+            self.firstSolution = copy.deepcopy(state)
+            if hooks is not None:
+                hooks.onSolution(state)
+            return
+        pending = Stack()
+        pending.push((None, iter(state.moves())))
+        self.nodesExpanded += 1
+        self.maxFrontier = 1
+        if hooks is not None:
+            hooks.onNodeExpanded(state, 1)
+        countdown = CANCEL_INTERVAL
+        while not pending.empty():
+            countdown -= 1
+            if countdown == 0:
+                countdown = CANCEL_INTERVAL
+                if self.isCancelled():
+                    break
+            move, options = pending.top()
+            nextMove = next(options, None)
+            if nextMove is None:
+                pending.pop()
+                if move is not None:
+                    state.unmakeMove(move)
+                    self.backtracks += 1
+                    if hooks is not None:
+                        hooks.onBacktrack(state)
+                continue
+            if not state.makeMove(nextMove):
+                state.unmakeMove(nextMove)
+                self.backtracks += 1
+                if hooks is not None:
+                    hooks.onBacktrack(state)
+            elif state.isDone():
+                self.total_solns += 1
+                if self.firstSolution is None:
+                    self.firstSolution = copy.deepcopy(state)
+                if hooks is not None:
+                    hooks.onSolution(state)
+                state.unmakeMove(nextMove)
+                if self.limitReached():
+                    break
+            else:
+                pending.push((nextMove, iter(state.moves())))
+                self.nodesExpanded += 1
+                frontier = pending.size()
+                if frontier > self.maxFrontier:
+                    self.maxFrontier = frontier
+                if hooks is not None:
+                    hooks.onNodeExpanded(state, frontier)
+                if self.verbose:
+                    print("Expanded:", state)
+                    print("Move:", nextMove)
+                    print("Stack length:", pending.size())
+                    print( "-------------------------------")
+
+        # Undo the moves still applied if the search stopped early
+        # (limit reached or cancelled)
+        while not pending.empty():
+            move, options = pending.pop()
+            if move is not None:
+                state.unmakeMove(move)
 
-    def showPath(self, node):
+
+    def showPath(self, node=None):
+        """
+        Prints the states from the start state to the given goal node
+        (by default the first goal found). Requires recordPath.
+        """
+        if node is None:
+            node = self.firstGoal
         path = self.buildPath(node)
         for current in path:
             print( current.state)
@@ -138,7 +392,10 @@ class Search:
         Beginning at the goal node, follow the parent links back
         to the start state.  Create a list of the states traveled
         through during the search from start to finish.
+        Requires recordPath.
         """
+        if not self.recordPath or self.inPlace:
+            raise Exception("Paths are only recorded with recordPath and without inPlace")
         result = []
         while node != None:
             result.insert(0, node)
@@ -149,6 +406,8 @@ class ProblemState:
     """
     An interface class for search problem domains.
     """
+    __slots__ = ()
+
     def __str__(self):
         """
         Returns a string representing the state.
@@ -174,11 +433,82 @@ class ProblemState:
         """
         abstract()
 
+    def isTree(self):
+        """
+        Returns whether the states reachable from this one form a tree,
+        i.e. no state can be generated twice. Search then skips duplicate
+        detection, so its memory is bounded by the search depth.
+        """
+        return False
+
+    def key(self):
+        """
+        Returns a compact hashable value representing unique states,
+        used by Search to detect states it has already generated.
+        Domains should override it when dictkey is costly to build.
+        """
+        return self.dictkey()
+
+    def isDone(self):
+        """
+        Returns whether the state is a solution.
+        """
+        abstract()
+
+    def setPropagation(self, propagation):
+        """
+        Sets a stage that deduces forced changes after every move.
+        Only needed for domains supporting propagation.
+        """
+        abstract()
+
+    def propagate(self):
+        """
+        Runs the propagation stage on the state itself and returns False
+        if it finds a contradiction.
+        Only needed for domains supporting propagation.
+        """
+        abstract()
+
+    def unpropagate(self):
+        """
+        Undoes the last propagate call.
+        Only needed for domains supporting propagation.
+        """
+        abstract()
+
+    def setBranching(self, branching):
+        """
+        Selects how the state picks what its successors change.
+        Only needed for domains offering several branching strategies.
+        """
+        abstract()
+
+    def moves(self):
+        """
+        Returns a list of moves that can be applied to the state.
+        Only needed for in-place search.
+        """
+        abstract()
+
+    def makeMove(self, move):
+        """
+        Applies the given move to the state itself and returns False if the
+        state can tell the move leads to no solution.
+        Only needed for in-place search.
+        """
+        abstract()
+
+    def unmakeMove(self, move):
+        """
+        Undoes a move previously applied with makeMove.
+        Only needed for in-place search.
+        """
+        abstract()
 
-import sudoku
-import generator
 
 if __name__ == "__main__":
+    import sudoku
     full_board = [
         [ 3, 4, 8, 7, 1, 2, 9, 6, 5],
         [ 2, 5, 6, 9, 4, 8, 7, 1, 3],
@@ -55,6 +55,79 @@ import math
 import copy
 from random import randint, choice
 from search_problem import *
+from constraints import (Constraints, digitsOf, toCells, toBoard, ALL_DIGITS,
+                         ROW_OF, COL_OF, BOX_OF)
+
+
+def findConflictIn(cells):
+    """
+    Takes the 81 entries of a board (row-major) and checks its rows,
+    columns and 3x3 grids in a single pass, keeping a mask of the numbers
+    seen in every unit
+
+    return: None if no number appears twice in a unit, otherwise the first
+    conflict found as a (unit, index, number, cell) tuple where unit is
+    "row", "col" or "box", index is that unit's index (0 to 8) and cell
+    (0 to 80) is the entry repeating number
+    """
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    for cell in range(81):
+        number = cells[cell]
+        if number:
+            bit = 1 << (number - 1)
+            row = ROW_OF[cell]
+            col = COL_OF[cell]
+            box = BOX_OF[cell]
+            if rows[row] & bit:
+                return ("row", row, number, cell)
+            if cols[col] & bit:
+                return ("col", col, number, cell)
+            if boxes[box] & bit:
+                return ("box", box, number, cell)
+            rows[row] |= bit
+            cols[col] |= bit
+            boxes[box] |= bit
+    return None
+
+
+def verifyCells(cells):
+    """
+    Takes the 81 entries of a board (row-major) and returns whether it is
+    complete and follows the rules. A complete unit holds each number once
+    iff its mask has all nine bits set, so no duplicate check is needed.
+    """
+    if 0 in cells:
+        return False
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    for cell in range(81):
+        bit = 1 << (cells[cell] - 1)
+        rows[ROW_OF[cell]] |= bit
+        cols[COL_OF[cell]] |= bit
+        boxes[BOX_OF[cell]] |= bit
+    for unit in range(9):
+        if rows[unit] != ALL_DIGITS or cols[unit] != ALL_DIGITS or \
+                boxes[unit] != ALL_DIGITS:
+            return False
+    return True
+
+
+def verifyMany(boards):
+    """
+    Takes an iterable of boards (9x9 lists of lists, or 81 flat entries)
+    and returns a list telling for each of them whether it is a complete
+    board following the rules
+    """
+    result = []
+    for board in boards:
+        if len(board) != 81:
+            board = toCells(board)
+        result.append(verifyCells(board))
+    return result
+
 
 class Sudoku(ProblemState):
     """
@@ -66,16 +139,78 @@ class Sudoku(ProblemState):
     This logic has to be kept in mind when calling this class in a main game
     module.
 
+    The entries are stored in a flat bytearray (self.cells, row-major order)
+    shared with the constraint masks. The board attribute converts to and
+    from the 9x9 list of lists layout; assigning it replaces the whole board.
+
     """
 
+    __slots__ = ("cells", "operator", "branching", "propagation",
+                 "constraints", "trail", "marks", "cachedKey")
+
 
     ENTRY = 0
     ROWS = COLUMNS = 9
 
-    def __init__(self, boardState, operator = None):
-        """ Takes a Sudoku Board and creates a game """
-        self.board = boardState
+    # Branching strategies used to pick the entry to fill next
+    FIRST_BLANK = "first-blank"     # first blank entry in row-major order
+    MRV = "mrv"                     # blank entry with the fewest candidates
+
+    def __init__(self, boardState, operator = None, constraints = None,
+                 branching = FIRST_BLANK, propagation = None):
+        """
+        Takes a Sudoku Board (a 9x9 list of lists, or a flat bytearray
+        of 81 entries) and creates a game
+
+        The row, column and grid masks of the board are built from the board
+        unless they are given (e.g. by a parent state that already has them),
+        in which case the board is the one held by the constraints
+
+        propagation is an optional Propagator (see propagation.py) run after
+        every move to fill the entries that move forces
+        """
         self.operator = operator
+        self.branching = branching
+        self.propagation = propagation
+        # Changes made by placeEntry/eliminateCandidates, and the length of
+        # the trail before each move (or propagate call) still applied
+        self.trail = []
+        self.marks = []
+        self.cachedKey = None
+        if constraints is None:
+            constraints = Constraints(boardState, branching == self.MRV)
+        self.constraints = constraints
+        self.cells = constraints.cells
+
+    @property
+    def board(self):
+        """ The board as a new 9x9 list of lists """
+        return toBoard(self.cells)
+
+    @board.setter
+    def board(self, boardState):
+        """ Replaces the whole board with a 9x9 list of lists """
+        self.constraints = Constraints(toCells(boardState),
+                                       self.branching == self.MRV)
+        self.cells = self.constraints.cells
+        self.trail = []
+        self.marks = []
+        self.cachedKey = None
+
+    def setBranching(self, branching):
+        """
+        Selects the strategy (FIRST_BLANK or MRV) used to pick the entry
+        that successors fill
+        """
+        self.branching = branching
+        if branching == self.MRV and not self.constraints.trackCounts:
+            self.constraints.recount()
+
+    def setPropagation(self, propagation):
+        """
+        Sets the Propagator run after every move (None to disable it)
+        """
+        self.propagation = propagation
 
     def __str__(self):
         """
@@ -94,7 +229,7 @@ class Sudoku(ProblemState):
                 str_board += "-"*17 + "\n"
 
             for j in range(self.COLUMNS):
-                str_board += str(self.board[i][j])
+                str_board += str(self.cells[i*9 + j])
                 if j != (self.COLUMNS-1) and (j%3) == 2:
                     str_board += "|"
                 elif j == (self.COLUMNS-1):
@@ -116,7 +251,7 @@ class Sudoku(ProblemState):
                 result += "-"*17 + "\n"
 
             for j in range(self.COLUMNS):
-                result += str(self.board[i][j])
+                result += str(self.cells[i*9 + j])
                 if j != (self.COLUMNS-1) and (j%3) == 2:
                     result += "|"
                 elif j == (self.COLUMNS-1):
@@ -125,28 +260,46 @@ class Sudoku(ProblemState):
                     result += ","
         return result
 
+    def key(self):
+        """
+        Returns the 81 entries as bytes, a compact hashable key for the
+        board. The key is cached until the board changes.
+        """
+        if self.cachedKey is None:
+            self.cachedKey = bytes(self.cells)
+        return self.cachedKey
+
+    def isTree(self):
+        """
+        Every successor fills the same blank entry with a different number,
+        and entries are never emptied, so two search paths never meet: the
+        search space is a tree
+        """
+        return True
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        """
+        Two Sudoku states are equal when their boards hold the same entries
+        """
+        if not isinstance(other, Sudoku):
+            return NotImplemented
+        return self.cells == other.cells
+
     def equals(self, other):
         """
         Tests whether the self (this) state instance
         equals the given other state.
         """
-        for i in range(self.ROWS):
-            for j in range(self.COLUMNS):
-                if self.board[i][j] != other.board[i][j]:
-                    return False
-        return True
+        return self.cells == other.cells
 
     def resetBoard(self):
         """
         Initializes the Sudoku board by adding zeros to the empty entries
         """
-        board = []
-        for i in range(self.ROWS):
-            row = []
-            for j in range(self.COLUMNS):
-                row.append(self.ENTRY)
-            board.append(row)
-        self.board = board
+        self.board = [[self.ENTRY] * self.COLUMNS for i in range(self.ROWS)]
 
 
     def printBoard(self):
@@ -158,8 +311,8 @@ class Sudoku(ProblemState):
         for i in range(self.ROWS):
             print("||", end=" ")
             for j in range(self.COLUMNS):
-                if self.board[i][j] != 0:
-                    print(self.board[i][j], end=" ")
+                if self.cells[i*9 + j] != 0:
+                    print(self.cells[i*9 + j], end=" ")
                 else:
                     print(" ", end=" ")
                 if j != (self.COLUMNS-1) and (j%3) == 2:
@@ -178,7 +331,15 @@ class Sudoku(ProblemState):
         number and a column number and updates the sudoku board with that
         number
         """
-        self.board = self.newBoard(row, col, number)
+        previous = self.cells[row*9 + col]
+        self.cachedKey = None
+        if previous != 0:
+            self.constraints.clear(row, col, previous)
+            # The number may still be held elsewhere in a unit if the board
+            # breaks the rules
+            self.constraints.markHeld(row, col, previous)
+        if number != 0:
+            self.constraints.place(row, col, number)
 
     def newBoard(self, row, col, number):
         """
@@ -187,97 +348,163 @@ class Sudoku(ProblemState):
         Creates an updated version the sudoku board with that number
         Returns the new board
         """
-        updatedBoard = copy.deepcopy(self.board)
+        updatedBoard = toBoard(self.cells)
         updatedBoard[row][col] = number
         return updatedBoard
 
-    def __isValidRow(self, row, number):
+    def isValid(self, row, col, number):
         """
-        Takes a number with the index of row (0 to 8)
-        and verifies whether the given number is allowed in the given row
+        Takes a number and a location on the sudoku board,
+        i.e. a row index (0 to 8) and a column index (0 to 8),
+        and verifies whether the given entry is allowed or not.
 
-        return: True iff number is not already present in the row
+        return: True iff the number is allowed in that specific location
         """
-        for col in range(self.COLUMNS):
-            if self.board[row][col] == number:
-                return False
-        return True
+        return self.constraints.isAllowed(row, col, number)
 
-    def __isValidCol(self, col, number):
+    def verify(self):
+        """
+        Returns whether the board is complete and follows the rules, checking
+        the entries themselves rather than trusting the masks (which assume
+        there are no duplicates, see constraints.py)
         """
-        Takes a number with the index of column (0 to 8)
-        and verifies whether the given number is allowed in the given column
+        return verifyCells(self.cells)
 
-        return: True iff number is not already present in the column
+    def findConflict(self):
         """
-        for row in range(self.ROWS):
-            if self.board[row][col] == number:
-                return False
-        return True
+        Returns None if no number appears twice in a row, column or 3x3 grid
+        of the board, otherwise the first (unit, index, number, cell)
+        conflict found (see findConflictIn)
+        """
+        return findConflictIn(self.cells)
 
-    def __isValidGrid(self, row, col, number):
+    def getFirstBlankEntry(self):
         """
-        Takes a number with the index of its row (0 to 8) and the index
-        of column (0 to 8).
-        By figuring out which 3x3 grid the number belongs to it and verifies
-        whether the given number is allowed in the given 3x3 grid
+        Returns a tuple of the index of the first blank entry or None otherwise
+        """
+        cell = self.cells.find(0)
+        if cell < 0:
+            return None
+        return divmod(cell, 9)
 
-        return: True iff number is not already present in 3x3 grid
+    def getBranchEntry(self):
+        """
+        Returns a tuple of the index of the blank entry chosen by the
+        branching strategy or None if the board is complete
         """
-        row_triplet = row//3
-        col_triplet = col//3
+        if self.branching == self.MRV:
+            return self.constraints.mostConstrained()
+        return self.getFirstBlankEntry()
 
-        for row in range(3):
-            for col in range(3):
-                if number == self.board[row_triplet*3 + row][col_triplet*3 + col]:
-                    return False
-        return True
 
-    def isValid(self, row, col, number):
+    def moves(self):
         """
-        Takes a number and a location on the sudoku board,
-        i.e. a row index (0 to 8) and a column index (0 to 8),
-        and verifies whether the given entry is allowed or not.
+        Returns the list of (row, col, number) moves allowed on the blank
+        entry chosen by the branching strategy, or an empty list if the
+        board is complete
+        """
+        indices = self.getBranchEntry()
+        result = []
+        if indices is not None:
+            row = indices[0]
+            col = indices[1]
+            for i in digitsOf(self.constraints.candidates(row, col)):
+                result.append((row, col, i))
+        return result
 
-        return: True iff the number is allowed in that specific location
+    def placeEntry(self, row, col, number):
         """
-        return self.__isValidGrid(row, col, number) and\
-            self.__isValidRow(row, number) and\
-            self.__isValidCol(col, number)
+        Fills a blank entry in place and records it so it can be undone
+        """
+        self.constraints.place(row, col, number)
+        self.trail.append(("place", row, col, number))
+        self.cachedKey = None
 
-    def getFirstBlankEntry(self):
+    def eliminateCandidates(self, cell, mask):
         """
-        Returns a tuple of the index of the first blank entry or None otherwise
+        Removes the numbers in mask from the candidates of a blank cell
+        (0 to 80) and records it so it can be undone
+
+        return: the mask of numbers that actually were removed
         """
-        for i in range(self.ROWS):
-            for j in range(self.COLUMNS):
-                if self.board[i][j] == 0:
-                    return (i,j)
-        return None
+        removed = self.constraints.eliminate(cell, mask)
+        if removed:
+            self.trail.append(("eliminate", cell, removed))
+        return removed
+
+    def undoTo(self, mark):
+        """
+        Undoes the recorded changes until the trail has mark entries
+        """
+        self.cachedKey = None
+        while len(self.trail) > mark:
+            change = self.trail.pop()
+            if change[0] == "place":
+                kind, row, col, number = change
+                self.constraints.clear(row, col, number)
+            else:
+                kind, cell, mask = change
+                self.constraints.restore(cell, mask)
+
+    def propagate(self):
+        """
+        Runs the propagation stage on this board in place, as a step that
+        unpropagate can undo
+
+        return: False iff the board was found to have no solution
+        """
+        self.marks.append(len(self.trail))
+        if self.propagation is not None:
+            return self.propagation.propagate(self)
+        return True
+
+    def unpropagate(self):
+        """
+        Undoes the last propagate call
+        """
+        self.undoTo(self.marks.pop())
 
+    def makeMove(self, move):
+        """
+        Applies a (row, col, number) move to this board in place, followed
+        by the propagation stage if there is one
+
+        return: False iff the move was found to lead to no solution
+        """
+        row, col, number = move
+        self.marks.append(len(self.trail))
+        self.placeEntry(row, col, number)
+        if self.propagation is not None:
+            return self.propagation.propagate(self)
+        return True
+
+    def unmakeMove(self, move):
+        """
+        Undoes a (row, col, number) move previously applied by makeMove,
+        including everything the propagation stage deduced from it
+        """
+        self.undoTo(self.marks.pop())
 
     def followingStates(self):
         """
         Returns a list of valid successors to the current state.
         """
-        indices = self.getFirstBlankEntry()
         result = []
-        if indices is not None:
-            row = indices[0]
-            col = indices[1]
-            for i in range(1, 10):
-                if self.isValid(row, col, i):
-                    succBoard = self.newBoard(row, col, i)
-                    result.append(Sudoku(succBoard))
+        for row, col, i in self.moves():
+            succConstraints = self.constraints.copy()
+            succConstraints.place(row, col, i)
+            successor = Sudoku(succConstraints.cells, constraints=succConstraints,
+                               branching=self.branching,
+                               propagation=self.propagation)
+            if successor.propagate():
+                result.append(successor)
         return result
 
     def isDone(self):
         """
         Returns whether or not the board is complete or not
         """
-        if self.getFirstBlankEntry() is not None:
-            return False
-        return True
+        return self.constraints.blanks == 0
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 Unit Tests for the Sudoku class
 """
 from sudoku import *
+from fixtures import BOARD, SOLUTION
 import unittest as u
 
 class SudokuTest(u.TestCase):
@@ -47,6 +48,19 @@ class SudokuTest(u.TestCase):
         actual = self.test_game.dictkey()
         self.assertEqual(actual, expected, "Testing dictkey method")
 
+    def test_key(self):
+        key = self.test_game.key()
+        self.assertEqual(key, bytes(81), "Testing key holds the 81 entries")
+        self.test_game.updateEntry(0,0,5)
+        self.assertNotEqual(self.test_game.key(), key, "Testing key changes with the board")
+
+    def test_hash_eq(self):
+        otherGame = Sudoku([[0 for j in range(9)] for i in range(9)])
+        self.assertEqual(self.test_game, otherGame, "Testing equal boards are equal")
+        self.assertEqual(len({self.test_game, otherGame}), 1, "Testing equal boards hash alike")
+        otherGame.updateEntry(4,4,1)
+        self.assertNotEqual(self.test_game, otherGame, "Testing different boards differ")
+
     def test_equals_correct(self):
         otherBoard = [[0 for j in range(9)] for i in range(9)]
         otherGame = Sudoku(otherBoard)
@@ -90,6 +104,16 @@ class SudokuTest(u.TestCase):
         self.assertFalse(self.test_game.isValid(8,4,9), "Testing isValid with\
         incorrect data in middle col at entry 8,4")
 
+    def test_isValid_after_clearing_duplicate(self):
+        self.test_game.updateEntry(0,0,5)
+        self.test_game.updateEntry(0,1,5)
+        self.test_game.updateEntry(0,1,0)
+        self.assertFalse(self.test_game.isValid(0,2,5), "Testing isValid after\
+        clearing one of two equal numbers in a row")
+        self.test_game.updateEntry(0,0,0)
+        self.assertTrue(self.test_game.isValid(0,2,5), "Testing isValid after\
+        clearing both equal numbers in a row")
+
     def test_isValid_correct_grid(self):
         self.assertTrue(self.test_game.isValid(2,8,3), "Testing isValid with correct\
          data on 3rd grid (counting horizontally) at entry 2,8")
@@ -144,6 +168,150 @@ class SudokuTest(u.TestCase):
             result = result and value
         self.assertTrue(result, "Testing followingStates method")
 
+    def test_moves(self):
+        self.test_game.updateEntry(0,1,3)
+        expected = [(0,0,i) for i in range(1,10) if i != 3]
+        self.assertEqual(self.test_game.moves(), expected, "Testing moves on first blank entry")
+
+    def test_makeMove_unmakeMove(self):
+        self.test_game.makeMove((4,4,9))
+        self.assertEqual(self.test_game.board[4][4], 9, "Testing makeMove updates board")
+        self.assertFalse(self.test_game.isValid(4,0,9), "Testing makeMove updates masks")
+        self.test_game.unmakeMove((4,4,9))
+        self.assertEqual(self.test_game.board[4][4], 0, "Testing unmakeMove clears board")
+        self.assertTrue(self.test_game.isValid(4,0,9), "Testing unmakeMove clears masks")
+
+    def test_getBranchEntry_mrv(self):
+        for i in range(8):
+            self.test_game.updateEntry(4,i,i+1)
+        self.test_game.setBranching(Sudoku.MRV)
+        self.assertEqual(self.test_game.getBranchEntry(), (4,8),\
+        "Testing MRV picks the entry with a single candidate")
+        self.assertEqual(self.test_game.moves(), [(4,8,9)],\
+        "Testing MRV moves on the most constrained entry")
+
+    def test_getBranchEntry_first_blank(self):
+        for i in range(8):
+            self.test_game.updateEntry(4,i,i+1)
+        self.assertEqual(self.test_game.getBranchEntry(), (0,0),\
+        "Testing first blank branching is the default")
+
+    def test_board_conversion(self):
+        board = [[(i + j) % 10 for j in range(9)] for i in range(9)]
+        self.assertEqual(toBoard(toCells(board)), board, "Testing flat board round trip")
+        self.assertEqual(Sudoku(board).board, board, "Testing board property")
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.test_game, "__dict__"), "Testing Sudoku has no __dict__")
+
+    def test_verify(self):
+        solution = [[(i*3 + i//3 + j) % 9 + 1 for j in range(9)] for i in range(9)]
+        self.assertTrue(Sudoku(solution).verify(), "Testing complete valid board")
+        self.assertFalse(self.test_game.verify(), "Testing empty board is not complete")
+        solution[4][4], solution[4][5] = solution[4][5], solution[4][4]
+        self.assertFalse(Sudoku(solution).verify(), "Testing swapped entries break the columns")
+
+    def test_findConflict(self):
+        self.assertIsNone(self.test_game.findConflict(), "Testing no conflict on empty board")
+        self.test_game.updateEntry(0, 0, 5)
+        self.test_game.updateEntry(0, 7, 5)
+        self.assertEqual(self.test_game.findConflict(), ("row", 0, 5, 7), "Testing row conflict")
+        board = [[0 for j in range(9)] for i in range(9)]
+        board[2][3] = 4
+        board[6][3] = 4
+        self.assertEqual(Sudoku(board).findConflict(), ("col", 3, 4, 57), "Testing column conflict")
+        board[6][3] = 0
+        board[1][5] = 4
+        self.assertEqual(Sudoku(board).findConflict(), ("box", 1, 4, 21), "Testing grid conflict")
+
+    def test_verifyMany(self):
+        solution = [[(i*3 + i//3 + j) % 9 + 1 for j in range(9)] for i in range(9)]
+        broken = [row[:] for row in solution]
+        broken[0][0] = broken[0][1]
+        self.assertEqual(verifyMany([solution, broken, toCells(solution), bytes(81)]),\
+        [True, False, True, False], "Testing batch verification")
+
+
+class SearchTest(u.TestCase):
+
+    def setUp(self):
+        board = [[0 for j in range(9)] for i in range(9)]
+        board[0] = [ 3, 4, 8, 7, 1, 2, 9, 6, 5]
+        board[3] = [ 4, 9, 7, 1, 3, 5, 6, 2, 8]
+        board[4] = [ 5, 6, 3, 8, 2, 7, 1, 9, 4]
+        board[6] = [ 7, 3, 9, 2, 8, 1, 5, 4, 6]
+        board[7] = [ 6, 2, 4, 3, 5, 9, 8, 7, 1]
+        board[8] = [ 1, 8, 5, 6, 7, 4, 2, 3, 9]
+        self.board = board
+
+    def test_search(self):
+        search = Search(Sudoku(copy.deepcopy(self.board)))
+        self.assertEqual(search.getNumSolns(), 12, "Testing number of solutions")
+
+    def test_search_tree(self):
+        search = Search(Sudoku(copy.deepcopy(self.board)))
+        self.assertIsNone(search.uniqueStates, "Testing no duplicate table for tree searches")
+
+    def test_search_recordPath(self):
+        search = Search(Sudoku(copy.deepcopy(self.board)), limit=1)
+        path = search.buildPath(search.firstGoal)
+        self.assertEqual(len(path), 28, "Testing path from the start to the first goal")
+        self.assertEqual(path[-1].state, search.getFirstSolution(), "Testing path ends on the goal")
+
+    def test_search_no_recordPath(self):
+        search = Search(Sudoku(copy.deepcopy(self.board)), recordPath=False)
+        self.assertEqual(search.getNumSolns(), 12, "Testing count without parent links")
+        self.assertRaises(Exception, search.buildPath, None)
+
+    def test_search_inPlace(self):
+        state = Sudoku(copy.deepcopy(self.board))
+        search = Search(state, inPlace=True)
+        self.assertEqual(search.getNumSolns(), 12, "Testing number of solutions in place")
+        self.assertEqual(state.board, self.board, "Testing in place search restores the board")
+
+    def test_search_mrv(self):
+        for inPlace in (False, True):
+            state = Sudoku(copy.deepcopy(self.board))
+            search = Search(state, inPlace=inPlace, branching=Sudoku.MRV)
+            self.assertEqual(search.getNumSolns(), 12, "Testing MRV finds every solution")
+            self.assertEqual(state.board, self.board, "Testing MRV search leaves the board")
+
+    def test_search_propagation(self):
+        from propagation import Propagator
+        for inPlace in (False, True):
+            state = Sudoku(copy.deepcopy(self.board))
+            search = Search(state, inPlace=inPlace,
+                            propagation=Propagator(True, True))
+            self.assertEqual(search.getNumSolns(), 12, "Testing propagation finds every solution")
+            self.assertEqual(state.board, self.board, "Testing propagation is undone after the search")
+
+    def test_getFirstSolution(self):
+        from propagation import Propagator
+        for inPlace in (False, True):
+            search = Search(Sudoku(copy.deepcopy(self.board)), inPlace=inPlace, limit=1)
+            self.assertTrue(search.getFirstSolution().isDone(),\
+            "Testing first solution is a complete board")
+        for inPlace in (False, True):
+            state = Sudoku(copy.deepcopy(BOARD))
+            search = Search(state, inPlace=inPlace, propagation=Propagator())
+            self.assertEqual(search.getFirstSolution().board, SOLUTION,\
+            "Testing first solution found by propagation alone")
+            self.assertEqual(state.board, BOARD, "Testing the start state is restored")
+
+    def test_countSolutions_limit(self):
+        count, stats = Search.countSolutions(Sudoku(copy.deepcopy(self.board)), limit=2)
+        full = Search(Sudoku(copy.deepcopy(self.board)))
+        self.assertEqual(count, 2, "Testing count stops at the limit")
+        self.assertTrue(stats["limitReached"], "Testing stats report the limit")
+        self.assertTrue(stats["nodesExpanded"] < full.getStats()["nodesExpanded"],
+            "Testing early termination expands fewer nodes")
+
+    def test_countSolutions_inPlace_limit(self):
+        state = Sudoku(copy.deepcopy(self.board))
+        count, stats = Search.countSolutions(state, limit=3, inPlace=True)
+        self.assertEqual(count, 3, "Testing in place count stops at the limit")
+        self.assertEqual(state.board, self.board, "Testing early stop restores the board")
+
 
 if __name__ == "__main__":
     u.main()
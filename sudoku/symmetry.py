@@ -0,0 +1,136 @@
+"""
+This module describes the validity-preserving transformations of a Sudoku
+board as index permutations of its 81 entries (row-major, cell = row*9 + col).
+
+A permutation perm is applied with a single gather:
+
+    new[cell] = old[perm[cell]]
+
+so applying perm then other is the same as applying compose(perm, other),
+and a whole chain of transformations costs one gather once composed.
+
+The geometric part of the Sudoku group is generated by
+    * permuting the three bands (groups of three rows) and the three stacks
+      (groups of three columns)
+    * permuting the rows inside each band and the columns inside each stack
+    * transposing the board
+which gives 2 * 6^8 = 3 359 232 distinct permutations. Relabelling the
+numbers (9! ways) is kept separate since it acts on values, not positions.
+
+The rotations, reflections and swaps used by generator.py are part of that
+group and are kept below as permutations too.
+"""
+
+from itertools import permutations
+
+IDENTITY = tuple(range(81))
+
+# TRANSPOSE[row*9 + col] = col*9 + row
+TRANSPOSE = tuple((cell % 9)*9 + cell // 9 for cell in range(81))
+
+
+
+def _permutation(source):
+    """
+    Returns the permutation whose entry (row, col) is the entry
+    source(row, col) of the board, as a cell index
+    """
+    return tuple(source(row, col) for row in range(9) for col in range(9))
+
+ROTATE90 = _permutation(lambda row, col: (8 - col)*9 + row)
+ROTATE180 = _permutation(lambda row, col: (8 - row)*9 + 8 - col)
+ROTATE270 = _permutation(lambda row, col: col*9 + 8 - row)
+# Reflections about the middle row and the middle column
+REFLECT_HORZ = _permutation(lambda row, col: (8 - row)*9 + col)
+REFLECT_VERT = _permutation(lambda row, col: row*9 + 8 - col)
+
+# The 6 orders of three items and the 1296 orders of the nine rows (or
+# columns) that keep every band (or stack) together
+TRIPLE_ORDERS = list(permutations(range(3)))
+LINE_ORDERS = [tuple(band*3 + line
+                     for band in bandOrder
+                     for line in (inner0, inner1, inner2)[bandOrder.index(band)])
+               for bandOrder in TRIPLE_ORDERS
+               for inner0 in TRIPLE_ORDERS
+               for inner1 in TRIPLE_ORDERS
+               for inner2 in TRIPLE_ORDERS]
+
+
+def compose(first, second):
+    """
+    Returns the permutation equivalent to applying first, then second
+    """
+    return tuple(first[cell] for cell in second)
+
+
+def applyPermutation(perm, cells):
+    """
+    Returns a new list with the entries of a flat board gathered by perm
+    """
+    return [cells[index] for index in perm]
+
+
+def applyToBoard(perm, board):
+    """
+    Returns a new 9x9 list of lists with the entries of board gathered by perm
+    """
+    cells = [entry for row in board for entry in row]
+    return [[cells[index] for index in perm[row*9:row*9 + 9]]
+            for row in range(9)]
+
+
+def swapRows(row1, row2):
+    """
+    Returns the permutation exchanging two rows
+    """
+    order = list(range(9))
+    order[row1], order[row2] = row2, row1
+    return linePermutation(order, range(9))
+
+
+def swapCols(col1, col2):
+    """
+    Returns the permutation exchanging two columns
+    """
+    order = list(range(9))
+    order[col1], order[col2] = col2, col1
+    return linePermutation(range(9), order)
+
+
+def linePermutation(rowOrder, colOrder, transpose=False):
+    """
+    Returns the permutation whose row r is row rowOrder[r] and whose column
+    c is column colOrder[c] of the board (transposed first if transpose)
+    """
+    if transpose:
+        return tuple(colOrder[col]*9 + rowOrder[row]
+                     for row in range(9) for col in range(9))
+    return tuple(rowOrder[row]*9 + colOrder[col]
+                 for row in range(9) for col in range(9))
+
+
+def randomPermutation(rng):
+    """
+    Returns a geometric permutation drawn uniformly from the whole group
+    """
+    return linePermutation(rng.choice(LINE_ORDERS), rng.choice(LINE_ORDERS),
+                           rng.random() < 0.5)
+
+
+def randomRelabelling(rng):
+    """
+    Returns a uniformly drawn relabelling of the numbers as a list where
+    index n holds the new number for n (index 0 keeps blanks blank)
+    """
+    numbers = list(range(1, 10))
+    rng.shuffle(numbers)
+    return [0] + numbers
+
+
+def randomTransform(cells, rng):
+    """
+    Returns a new flat board obtained from cells by a uniformly drawn
+    element of the full Sudoku group (relabelling and geometry)
+    """
+    relabel = randomRelabelling(rng)
+    return [relabel[cells[index]] for index in randomPermutation(rng)]
@@ -0,0 +1,55 @@
+from symmetry import *
+from sudoku import Sudoku
+import unittest as u
+import random
+
+SOLUTION = [int(n) for n in
+            "146792385258346791379581462437915826581627934692438157"
+            "713269548824153679965874213"]
+
+
+class SymmetryTest(u.TestCase):
+
+    def test_line_orders(self):
+        self.assertEqual(len(set(LINE_ORDERS)), 1296, "6^4 orders keep the bands together")
+        for order in LINE_ORDERS:
+            self.assertEqual({line // 3 for line in order[:3]}, {order[0] // 3},\
+            "The first three lines come from the same band")
+
+    def test_compose(self):
+        perm = randomPermutation(random.Random(1))
+        other = randomPermutation(random.Random(2))
+        self.assertEqual(applyPermutation(other, applyPermutation(perm, SOLUTION)),\
+        applyPermutation(compose(perm, other), SOLUTION), "Composed permutation applies both")
+        self.assertEqual(compose(TRANSPOSE, TRANSPOSE), IDENTITY, "Transposing twice does nothing")
+
+    def test_rotations_and_reflections(self):
+        self.assertEqual(compose(ROTATE90, ROTATE90), ROTATE180, "Two quarter turns make a half turn")
+        self.assertEqual(compose(ROTATE90, ROTATE180), ROTATE270, "Three quarter turns")
+        self.assertEqual(compose(ROTATE270, ROTATE90), IDENTITY, "A full turn does nothing")
+        self.assertEqual(compose(REFLECT_HORZ, REFLECT_VERT), ROTATE180,\
+        "Both reflections make a half turn")
+        self.assertEqual(compose(swapRows(1, 2), swapRows(1, 2)), IDENTITY,\
+        "Swapping twice does nothing")
+        self.assertEqual(compose(swapCols(3, 5), TRANSPOSE), compose(TRANSPOSE, swapRows(3, 5)),\
+        "Transposing turns column swaps into row swaps")
+
+    def test_transpose(self):
+        perm = linePermutation(range(9), range(9), transpose=True)
+        self.assertEqual(perm, TRANSPOSE, "Keeping every line in place only transposes")
+
+    def test_random_transform_is_valid(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            cells = randomTransform(SOLUTION, rng)
+            board = [cells[i*9:i*9 + 9] for i in range(9)]
+            state = Sudoku(board)
+            self.assertTrue(state.isDone(), "Transformed board is complete")
+            self.assertTrue(all(state.constraints.rows[i] == 0x1FF for i in range(9))\
+            and all(state.constraints.cols[i] == 0x1FF for i in range(9))\
+            and all(state.constraints.boxes[i] == 0x1FF for i in range(9)),\
+            "Transformed board is still a solution")
+
+
+if __name__ == "__main__":
+    u.main()
@@ -0,0 +1,158 @@
+"""
+This module checks, propagates and solves many boards at once with NumPy.
+
+The boards are given as an (N, 9, 9) array of uint8 (anything numpy.asarray
+can turn into one, e.g. a list of 9x9 lists of lists) with zeros for blanks.
+Every operation works on the whole batch with array operations, using the
+same 9-bit masks as constraints.py (bit n-1 is set iff n is present):
+
+    validateMany     boards without a number twice in a unit
+    candidateMasks   candidates of every blank entry
+    propagateSingles naked and hidden singles until nothing changes
+    solveMany        propagateSingles, then the scalar DancingLinks solver
+                     for the boards singles alone do not finish
+
+NumPy is optional: the module imports without it, but its functions raise
+ImportError when it is missing.
+"""
+
+from constraints import ALL_DIGITS, POPCOUNT, UNITS
+from dlx import DancingLinks
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Status of every board returned by propagateSingles
+OPEN = 0            # blanks left, singles are not enough
+SOLVED = 1          # complete and valid
+CONTRADICTION = 2   # breaks the rules, or a blank has no candidate left
+
+if np is not None:
+    UNIT_CELLS = np.array(UNITS, dtype=np.intp)                 # (27, 9)
+    POPCOUNT_TABLE = np.array(POPCOUNT, dtype=np.uint8)
+    # Number held by a single-candidate mask (0 for any other mask)
+    NUMBER_OF = np.zeros(ALL_DIGITS + 1, dtype=np.uint8)
+    for number in range(1, 10):
+        NUMBER_OF[1 << (number - 1)] = number
+    DIGIT_SHIFTS = np.arange(9, dtype=np.uint16)
+    # Mask bit of every entry value (values above 9 get none)
+    BIT_OF = np.zeros(256, dtype=np.uint16)
+    BIT_OF[1:10] = 1 << np.arange(9)
+
+
+def _cells(boards):
+    """
+    Returns the boards as a new (N, 81) uint8 array
+    """
+    if np is None:
+        raise ImportError("vectorized.py requires numpy")
+    cells = np.array(boards, dtype=np.uint8)
+    return cells.reshape(-1, 81)
+
+
+def _unitMasks(cells):
+    """
+    Returns the (N, 27) masks of the numbers present in every unit, and
+    whether every unit holds each of its numbers once
+    """
+    bits = BIT_OF[cells][:, UNIT_CELLS]                          # (N, 27, 9)
+    masks = np.bitwise_or.reduce(bits, axis=2)
+    filled = np.count_nonzero(bits, axis=2)
+    valid = (POPCOUNT_TABLE[masks] == filled).all(axis=1)
+    return masks, valid
+
+
+def _candidates(cells, masks):
+    """
+    Returns the (N, 81) candidate masks of the cells given their unit masks
+    """
+    used = masks[:, :9].repeat(9, axis=1)                         # rows
+    used = used | np.tile(masks[:, 9:18], 9)                      # columns
+    boxes = masks[:, 18:].reshape(-1, 3, 1, 3, 1)
+    boxes = np.broadcast_to(boxes, (len(cells), 3, 3, 3, 3))
+    used = used | boxes.reshape(-1, 81)                           # grids
+    return np.where(cells == 0, ALL_DIGITS & ~used, 0).astype(np.uint16)
+
+
+def validateMany(boards):
+    """
+    Returns an (N,) bool array, True for the boards where no number
+    appears twice in a row, column or 3x3 grid (blanks are allowed)
+    """
+    cells = _cells(boards)
+    masks, valid = _unitMasks(cells)
+    return valid & (cells <= 9).all(axis=1)
+
+
+def candidateMasks(boards):
+    """
+    Returns an (N, 9, 9) uint16 array with the candidate mask of every
+    blank entry (0 for filled entries)
+    """
+    cells = _cells(boards)
+    masks, valid = _unitMasks(cells)
+    return _candidates(cells, masks).reshape(-1, 9, 9)
+
+
+def propagateSingles(boards, maxRounds=81):
+    """
+    Fills the naked and hidden singles of every board, round after round,
+    until no board changes (or maxRounds rounds)
+
+    return: a (boards, status) tuple, the filled (N, 9, 9) boards and an
+    (N,) array holding OPEN, SOLVED or CONTRADICTION for each of them
+    """
+    cells = _cells(boards)
+    count = len(cells)
+    active = np.ones(count, dtype=bool)
+    status = np.full(count, OPEN, dtype=np.uint8)
+    for _ in range(maxRounds):
+        masks, valid = _unitMasks(cells)
+        candidates = _candidates(cells, masks)
+        blank = cells == 0
+        dead = ~valid | (blank & (candidates == 0)).any(axis=1)
+        done = valid & ~blank.any(axis=1)
+        status[active & dead] = CONTRADICTION
+        status[active & done] = SOLVED
+        active &= ~(dead | done)
+        if not active.any():
+            break
+        before = cells.copy()
+
+        # Naked singles
+        naked = active[:, None] & blank & (POPCOUNT_TABLE[candidates] == 1)
+        cells[naked] = NUMBER_OF[candidates[naked]]
+
+        # Hidden singles: a number that is a candidate of one cell of a unit
+        unitCandidates = candidates[:, UNIT_CELLS]                # (N, 27, 9)
+        has = (unitCandidates[..., None] >> DIGIT_SHIFTS) & 1     # (N, 27, 9, 9)
+        hidden = (has.sum(axis=2) == 1) & active[:, None, None]
+        board, unit, digit = np.nonzero(hidden)
+        position = has.argmax(axis=2)[board, unit, digit]
+        cells[board, UNIT_CELLS[unit, position]] = digit + 1
+
+        changed = (cells != before).any(axis=1)
+        if not changed.any():
+            break
+    return cells.reshape(-1, 9, 9), status
+
+
+def solveMany(boards):
+    """
+    Solves every board: singles are propagated on the whole batch, and
+    only the boards they leave open go through DancingLinks one by one
+
+    return: a (solutions, solved) tuple, the (N, 9, 9) boards (solved
+    where solved is True) and an (N,) bool array
+    """
+    solutions, status = propagateSingles(boards)
+    solved = status == SOLVED
+    for index in np.nonzero(status == OPEN)[0]:
+        solution = DancingLinks(solutions[index].tolist(), limit=1)\
+            .getFirstSolution()
+        if solution is not None:
+            solutions[index] = solution
+            solved[index] = True
+    return solutions, solved
@@ -0,0 +1,52 @@
+"""
+Unit Tests for the NumPy batch validator and solver
+"""
+from vectorized import *
+from sudoku import Sudoku
+from fixtures import BOARD, SOLUTION
+import unittest as u
+
+# Needs branching: only a few entries of SOLUTION are given
+SPARSE = [[SOLUTION[row][col] if (row + col) % 4 == 0 else 0 for col in range(9)]
+          for row in range(9)]
+
+def invalid():
+    board = [row[:] for row in BOARD]
+    board[0][1] = 1
+    return board
+
+
+@u.skipIf(np is None, "numpy is not installed")
+class VectorizedTest(u.TestCase):
+
+    def test_validateMany(self):
+        valid = validateMany([BOARD, SOLUTION, invalid()])
+        self.assertEqual(valid.tolist(), [True, True, False], "Testing duplicate detection")
+
+    def test_candidateMasks(self):
+        masks = candidateMasks([BOARD])[0]
+        state = Sudoku(BOARD)
+        for row in range(9):
+            for col in range(9):
+                expected = state.constraints.candidates(row, col) if BOARD[row][col] == 0 else 0
+                self.assertEqual(int(masks[row][col]), expected, "Testing candidates of entry")
+
+    def test_propagateSingles(self):
+        boards, status = propagateSingles([BOARD, invalid(), SPARSE])
+        self.assertEqual(boards[0].tolist(), SOLUTION, "Testing singles solve the board")
+        self.assertEqual(status.tolist(), [SOLVED, CONTRADICTION, OPEN], "Testing statuses")
+
+    def test_solveMany(self):
+        solutions, solved = solveMany([BOARD, SPARSE, invalid()])
+        self.assertEqual(solved.tolist(), [True, True, False], "Testing solved boards")
+        self.assertEqual(solutions[0].tolist(), SOLUTION, "Testing solution by singles")
+        self.assertTrue(validateMany(solutions[1:2])[0] and (solutions[1] > 0).all(),\
+        "Testing solution by the scalar solver")
+        for row in range(9):
+            for col in range(9):
+                if SPARSE[row][col]:
+                    self.assertEqual(solutions[1][row][col], SPARSE[row][col], "Testing givens kept")
+
+
+if __name__ == "__main__":
+    u.main()